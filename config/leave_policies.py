@@ -2,6 +2,26 @@
 Leave policy data - Mock data for the assignment
 """
 
+import sys
+from typing import Any, Optional
+
+
+def _intern_strings(obj: Any) -> Any:
+    """Recursively intern string keys and values of nested data in place"""
+    if isinstance(obj, dict):
+        items = [
+            (sys.intern(k) if isinstance(k, str) else k, _intern_strings(v))
+            for k, v in obj.items()
+        ]
+        obj.clear()
+        obj.update(items)
+    elif isinstance(obj, list):
+        obj[:] = [_intern_strings(v) for v in obj]
+    elif isinstance(obj, str):
+        return sys.intern(obj)
+    return obj
+
+
 LEAVE_POLICIES = {
     "US": {
         "PTO": {
@@ -133,11 +153,36 @@ MOCK_EMPLOYEES = {
     }
 }
 
+# Countries and leave type names repeat across records - share one copy
+_intern_strings(LEAVE_POLICIES)
+_intern_strings(MOCK_EMPLOYEES)
+
+# Case-insensitive indexes, built once at import so lookups are a single dict hit
+# casefolded country -> canonical country key
+_COUNTRY_INDEX: dict[str, str] = {
+    country.casefold(): country for country in LEAVE_POLICIES
+}
+
+# Flat (casefolded country, casefolded leave type or None) -> result index,
+# so a lookup is one hash of the combined key instead of two nested hits.
+# Results are built once and shared; they must not be mutated.
+_POLICY_INDEX: dict[tuple[str, Optional[str]], dict] = {}
+for _country, _policies in LEAVE_POLICIES.items():
+    _POLICY_INDEX[(_country.casefold(), None)] = _policies
+    for _policy_name, _policy_details in _policies.items():
+        _POLICY_INDEX[(_country.casefold(), _policy_name.casefold())] = {
+            _policy_name: _policy_details
+        }
+del _country, _policies, _policy_name, _policy_details
+
 
 def get_leave_policy(country: str, leave_type: str = None):
     """
     Get leave policy for a specific country and leave type
     
+    Lookups hit a prebuilt index on the casefolded arguments; the returned
+    dicts are shared and must not be mutated.
+    
     Args:
         country: Country code (US, India, UK)
         leave_type: Specific leave type (optional)
@@ -145,19 +190,9 @@ def get_leave_policy(country: str, leave_type: str = None):
     Returns:
         Policy details or None if not found
     """
-    country = country.upper()
-    
-    if country not in LEAVE_POLICIES:
-        return None
-    
-    if leave_type:
-        # Case-insensitive lookup
-        for policy_name, policy_details in LEAVE_POLICIES[country].items():
-            if policy_name.lower() == leave_type.lower():
-                return {policy_name: policy_details}
-        return None
-    
-    return LEAVE_POLICIES[country]
+    return _POLICY_INDEX.get(
+        (country.casefold(), leave_type.casefold() if leave_type else None)
+    )
 
 
 def get_employee_data(employee_id: str):
@@ -174,13 +209,21 @@ def get_employee_data(employee_id: str):
 
 
 def list_countries():
-    """Get list of supported countries"""
-    return list(LEAVE_POLICIES.keys())
+    """Get supported countries (immutable tuple)"""
+    return _COUNTRIES
 
 
 def list_leave_types(country: str):
-    """Get list of leave types for a country"""
-    country = country.upper()
-    if country not in LEAVE_POLICIES:
-        return []
-    return list(LEAVE_POLICIES[country].keys())
\ No newline at end of file
+    """Get leave types for a country (immutable tuple, empty if unknown)"""
+    country = _COUNTRY_INDEX.get(country.casefold())
+    if country is None:
+        return ()
+    return _LEAVE_TYPES[country]
+
+
+# Precomputed results for the list helpers above
+_COUNTRIES = tuple(LEAVE_POLICIES.keys())
+_LEAVE_TYPES = {
+    country: tuple(policies.keys())
+    for country, policies in LEAVE_POLICIES.items()
+}
\ No newline at end of file
@@ -4,8 +4,11 @@ Built with Google ADK (Agent Development Kit)
 """
 
 import os
+import hashlib
 import logging
-from typing import List, Dict, Any, Optional
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 import json
 
 # Note: In actual implementation, you would import from google.adk
@@ -33,15 +36,75 @@ except ImportError:
         def __init__(self, **kwargs):
             pass
 
-from litellm import completion
+# litellm is slow to import; it is loaded on first LLM call (see _get_completion)
+completion = None
+
+# orjson is much faster than stdlib json; fall back if not installed
+try:
+    import orjson
+    
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+    
+    _json_loads = orjson.loads
+except ImportError:
+    _json_dumps = json.dumps
+    _json_loads = json.loads
 
 from src.tools.leave_policy_tool import leave_policy_tool
-from src.tools.eligibility_tool import eligibility_tool
+from src.tools.eligibility_tool import get_eligibility_tool
 from src.callbacks.before_model import before_model_callback
 from src.callbacks.after_model import after_model_callback
 
 logger = logging.getLogger(__name__)
 
+# Max number of serialized user contexts kept per agent
+CONTEXT_CACHE_SIZE = 128
+
+# Max number of final LLM responses kept per agent
+RESPONSE_CACHE_SIZE = 512
+
+# Fallback responses (never cached)
+ERROR_RESPONSE = (
+    "I apologize, but I encountered an error processing your request. "
+    "Please try again or contact support if the issue persists."
+)
+TOO_COMPLEX_RESPONSE = (
+    "I've gathered the information, but the response became too complex. "
+    "Could you please rephrase your question or break it into smaller parts?"
+)
+
+
+def _hashable(value: Any) -> Any:
+    """
+    Convert a JSON-like value into a hashable equivalent for cache keys
+    
+    Scalars are paired with their type because True, 1 and 1.0 hash and
+    compare equal but serialize differently.
+    """
+    if isinstance(value, dict):
+        return frozenset((k, _hashable(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(v) for v in value)
+    return (type(value), value)
+
+
+@lru_cache(maxsize=32)
+def _unknown_tool_error(function_name: str) -> str:
+    """Get the (cached) JSON error payload for an unknown tool"""
+    return _json_dumps({"error": f"Unknown tool: {function_name}"})
+
+
+def _get_completion():
+    """Import litellm's completion function on first use"""
+    global completion
+    
+    if completion is None:
+        from litellm import completion as litellm_completion
+        completion = litellm_completion
+    
+    return completion
+
 
 class LeaveAgent:
     """
@@ -98,6 +161,13 @@ For eligibility questions:
 
 Remember: Always maintain context across the conversation. If a user asks a follow-up question, remember what you discussed earlier."""
     
+    # System message shared by every agent and request. Sent unchanged so
+    # providers with prompt prefix caching can reuse it - never mutate it.
+    _BASE_SYSTEM_MESSAGE = {
+        "role": "system",
+        "content": SYSTEM_INSTRUCTIONS
+    }
+    
     def __init__(
         self,
         model: str = None,
@@ -117,17 +187,31 @@ Remember: Always maintain context across the conversation. If a user asks a foll
         self.session_store = session_store
         
         # Tools available to the agent
+        eligibility_tool = get_eligibility_tool()
         self.tools = {
             "get_leave_policy": leave_policy_tool,
             "check_leave_eligibility": eligibility_tool
         }
         
+        # Tool schemas are static, build them once for every LLM call
+        self._tools_schema = [
+            leave_policy_tool.get_schema(),
+            eligibility_tool.get_schema()
+        ]
+        
         # Callbacks
         self.before_model_callback = before_model_callback
         self.after_model_callback = after_model_callback
         
-        # Conversation history (in-memory for single session)
-        self.conversation_history: List[Dict[str, str]] = []
+        # LRU cache of conversation digest -> final LLM response
+        self._response_cache: "OrderedDict[bytes, str]" = OrderedDict()
+        
+        # LRU cache of user context -> context system message
+        self._ctx_cache: "OrderedDict[frozenset, Dict[str, str]]" = OrderedDict()
+        
+        # Conversation history (in-memory for single session),
+        # stored compactly as (role, content) tuples
+        self.conversation_history: List[Tuple[str, str]] = []
         
         logger.info(
             f"LeaveAgent initialized with model: {self.model}, "
@@ -155,23 +239,22 @@ Remember: Always maintain context across the conversation. If a user asks a foll
         
         # Load session history if session_id provided
         if session_id and self.session_store:
-            self.conversation_history = self.session_store.load(session_id)
+            self.conversation_history = [
+                (msg["role"], msg["content"])
+                for msg in self.session_store.load(session_id)
+            ]
         
-        # Add user context to system if provided
-        context_prompt = ""
+        # Build messages for LLM. User context goes in a separate system
+        # message after the base one to keep the shared prompt prefix intact.
+        messages = [self._BASE_SYSTEM_MESSAGE]
         if user_context:
-            context_prompt = f"\n\nUser Context: {json.dumps(user_context)}"
-        
-        # Build messages for LLM
-        messages = [
-            {
-                "role": "system",
-                "content": self.SYSTEM_INSTRUCTIONS + context_prompt
-            }
-        ]
+            messages.append(self._get_context_message(user_context))
         
         # Add conversation history
-        messages.extend(self.conversation_history)
+        messages.extend(
+            {"role": role, "content": content}
+            for role, content in self.conversation_history
+        )
         
         # Add current user message
         messages.append({
@@ -180,38 +263,116 @@ Remember: Always maintain context across the conversation. If a user asks a foll
         })
         
         # Apply before_model callback
-        before_result = self.before_model_callback(messages)
-        validated_messages = before_result["messages"]
+        before_result = self.before_model_callback(
+            messages,
+            latest_user_idx=len(messages) - 1
+        )
+        validated_messages, metadata = before_result["messages"], before_result["metadata"]
         
-        if not before_result["metadata"]["validation_passed"]:
+        if not metadata.get("validation_passed", True):
             logger.warning(
-                f"Input validation issues: {before_result['metadata']['issues']}"
+                f"Input validation issues: {metadata.get('issues', [])}"
             )
         
         # Get response from LLM with tools
-        response = self._call_llm_with_tools(validated_messages)
+        response = self._call_llm_cached(validated_messages)
         
         # Apply after_model callback
         after_result = self.after_model_callback(response)
         final_response = after_result["response"]
         
         # Update conversation history
-        self.conversation_history.append({
-            "role": "user",
-            "content": message
-        })
-        self.conversation_history.append({
-            "role": "assistant",
-            "content": final_response
-        })
+        self.conversation_history.append(("user", message))
+        self.conversation_history.append(("assistant", final_response))
         
         # Save session if session_id provided
         if session_id and self.session_store:
-            self.session_store.save(session_id, self.conversation_history)
+            self.session_store.save(session_id, self.get_conversation_history())
         
         logger.info("Message processed successfully")
         return final_response
     
+    def _get_context_message(self, user_context: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Get the system message describing a user context
+        
+        The same context usually recurs on every turn of a session,
+        so messages are kept in a small LRU cache. Treat the returned
+        dict as immutable.
+        
+        Args:
+            user_context: User context (employee_id, country, etc.)
+            
+        Returns:
+            System message with the serialized user context
+        """
+        try:
+            key = _hashable(user_context)
+            context_message = self._ctx_cache.get(key)
+        except TypeError:
+            # Unhashable values, skip the cache
+            return {
+                "role": "system",
+                "content": f"User Context: {_json_dumps(user_context)}"
+            }
+        
+        if context_message is not None:
+            self._ctx_cache.move_to_end(key)
+            return context_message
+        
+        context_message = {
+            "role": "system",
+            "content": f"User Context: {_json_dumps(user_context)}"
+        }
+        self._ctx_cache[key] = context_message
+        if len(self._ctx_cache) > CONTEXT_CACHE_SIZE:
+            self._ctx_cache.popitem(last=False)
+        
+        return context_message
+    
+    def _call_llm_cached(self, messages: List[Dict[str, str]]) -> str:
+        """
+        Call LLM with tools, reusing responses for identical conversations
+        
+        Responses that used employee-specific tool calls or ended in an
+        error are not cached.
+        
+        Args:
+            messages: Conversation messages
+            
+        Returns:
+            Final response after tool calls
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for msg in messages:
+            digest.update(f"{msg['role']}\x1f{msg['content']}\x1e".encode())
+        key = digest.digest()
+        
+        cached = self._response_cache.get(key)
+        if cached is not None:
+            logger.debug("LLM response cache hit")
+            self._response_cache.move_to_end(key)
+            return cached
+        
+        start = len(messages)
+        response = self._call_llm_with_tools(messages)
+        
+        if response in (ERROR_RESPONSE, TOO_COMPLEX_RESPONSE) or not response:
+            return response
+        
+        # Skip caching personalized answers (tool calls for an employee)
+        personalized = any(
+            "employee_id" in tc["function"]["arguments"]
+            for msg in messages[start:]
+            for tc in msg.get("tool_calls", ())
+        )
+        if not personalized:
+            self._response_cache[key] = response
+            if len(self._response_cache) > RESPONSE_CACHE_SIZE:
+                self._response_cache.popitem(last=False)
+        
+        return response
+    
     def _call_llm_with_tools(self, messages: List[Dict[str, str]]) -> str:
         """
         Call LLM with tool support
@@ -229,18 +390,12 @@ Remember: Always maintain context across the conversation. If a user asks a foll
             iteration += 1
             logger.debug(f"LLM call iteration {iteration}")
             
-            # Prepare tool schemas for LLM
-            tools_schema = [
-                leave_policy_tool.get_schema(),
-                eligibility_tool.get_schema()
-            ]
-            
             # Call LLM
             try:
-                response = completion(
+                response = _get_completion()(
                     model=self.model,
                     messages=messages,
-                    tools=tools_schema,
+                    tools=self._tools_schema,
                     tool_choice="auto",
                     api_key=self.api_key
                 )
@@ -248,11 +403,12 @@ Remember: Always maintain context across the conversation. If a user asks a foll
                 message = response.choices[0].message
                 
                 # If no tool calls, return the response
-                if not hasattr(message, 'tool_calls') or not message.tool_calls:
+                tool_calls = getattr(message, 'tool_calls', None)
+                if not tool_calls:
                     return message.content
                 
                 # Process tool calls
-                logger.info(f"Processing {len(message.tool_calls)} tool calls")
+                logger.info(f"Processing {len(tool_calls)} tool calls")
                 
                 # Add assistant message with tool calls
                 messages.append({
@@ -267,47 +423,54 @@ Remember: Always maintain context across the conversation. If a user asks a foll
                                 "arguments": tc.function.arguments
                             }
                         }
-                        for tc in message.tool_calls
+                        for tc in tool_calls
                     ]
                 })
                 
-                # Execute each tool call
-                for tool_call in message.tool_calls:
-                    function_name = tool_call.function.name
-                    arguments = json.loads(tool_call.function.arguments)
-                    
-                    logger.info(
-                        f"Executing tool: {function_name} with args: {arguments}"
-                    )
-                    
-                    # Call the tool
-                    if function_name in self.tools:
-                        result = self.tools[function_name](**arguments)
-                    else:
-                        result = {"error": f"Unknown tool: {function_name}"}
-                    
-                    # Add tool result to messages
-                    messages.append({
-                        "role": "tool",
-                        "tool_call_id": tool_call.id,
-                        "name": function_name,
-                        "content": json.dumps(result)
-                    })
+                # Execute each tool call and add all results in one go
+                messages.extend([
+                    self._execute_tool_call(tool_call)
+                    for tool_call in tool_calls
+                ])
                 
                 # Continue loop to get final response
                 
             except Exception as e:
                 logger.error(f"Error calling LLM: {e}")
-                return (
-                    "I apologize, but I encountered an error processing your request. "
-                    "Please try again or contact support if the issue persists."
-                )
+                return ERROR_RESPONSE
         
         # If we hit max iterations, return a response
-        return (
-            "I've gathered the information, but the response became too complex. "
-            "Could you please rephrase your question or break it into smaller parts?"
+        return TOO_COMPLEX_RESPONSE
+    
+    def _execute_tool_call(self, tool_call: Any) -> Dict[str, str]:
+        """
+        Execute a single tool call requested by the LLM
+        
+        Args:
+            tool_call: Tool call from the LLM response
+            
+        Returns:
+            Tool result message for the conversation
+        """
+        function_name = tool_call.function.name
+        arguments = _json_loads(tool_call.function.arguments)
+        
+        logger.info(
+            f"Executing tool: {function_name} with args: {arguments}"
         )
+        
+        # Call the tool
+        if function_name in self.tools:
+            content = _json_dumps(self.tools[function_name](**arguments))
+        else:
+            content = _unknown_tool_error(function_name)
+        
+        return {
+            "role": "tool",
+            "tool_call_id": tool_call.id,
+            "name": function_name,
+            "content": content
+        }
     
     def reset_conversation(self, session_id: Optional[str] = None):
         """
@@ -324,8 +487,22 @@ Remember: Always maintain context across the conversation. If a user asks a foll
         logger.info("Conversation reset")
     
     def get_conversation_history(self) -> List[Dict[str, str]]:
-        """Get current conversation history"""
-        return self.conversation_history.copy()
+        """Get a copy of the current conversation history as message dicts"""
+        return [
+            {"role": role, "content": content}
+            for role, content in self.conversation_history
+        ]
+    
+    def iter_history(self) -> Iterator[Tuple[str, str]]:
+        """
+        Iterate over a snapshot of the conversation history
+        
+        Cheaper than get_conversation_history() as no message dicts are built.
+        
+        Yields:
+            Immutable (role, content) tuples
+        """
+        return iter(tuple(self.conversation_history))
 
 
 def main():
@@ -3,11 +3,14 @@ FastAPI Application for Leave Policy Agent
 Provides REST API endpoints for the agent
 """
 
+import asyncio
 import os
 import logging
+import threading
 import time
+from collections import OrderedDict
 from contextlib import asynccontextmanager
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.responses import JSONResponse, PlainTextResponse
@@ -18,7 +21,23 @@ from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_
 # Import agent and integrations
 from src.agents.leave_agent import LeaveAgent
 from src.integrations.circuit_breaker import get_all_circuit_breaker_stats
-from src.integrations.snowflake_client import get_snowflake_client
+from src.integrations.snowflake_client import (
+    get_snowflake_client,
+    close_snowflake_client
+)
+
+# orjson renders JSON much faster than the stdlib encoder; fall back to
+# the default JSONResponse if it is not installed
+try:
+    import orjson
+    
+    class FastJSONResponse(JSONResponse):
+        """JSONResponse rendered with orjson"""
+        
+        def render(self, content: Any) -> bytes:
+            return orjson.dumps(content)
+except ImportError:
+    FastJSONResponse = JSONResponse
 
 # Setup logging
 logging.basicConfig(
@@ -45,10 +64,98 @@ CHAT_MESSAGES = Counter(
     'Total chat messages processed'
 )
 
+# Pre-resolved metric children for the fixed endpoints, so the middleware
+# skips prometheus' label lookup (and its lock) on the hot path
+_KNOWN_ENDPOINTS = ("/", "/chat", "/health", "/metrics", "/stats")
+_DURATION_BY_ENDPOINT = {
+    path: REQUEST_DURATION.labels(endpoint=path) for path in _KNOWN_ENDPOINTS
+}
+# (endpoint, status) -> counter child, filled lazily for known endpoints
+_COUNT_BY_ENDPOINT_STATUS: Dict[tuple, Any] = {}
+
+# Last formatted timestamp, reused while the second hasn't changed
+_last_timestamp = (0, "")
+
+
+def _iso_now() -> str:
+    """Get current UTC time as an ISO 8601 string (second resolution)"""
+    global _last_timestamp
+    
+    now = int(time.time())
+    second, formatted = _last_timestamp
+    if now == second:
+        return formatted
+    
+    t = time.gmtime(now)
+    formatted = (
+        f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d}T"
+        f"{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}Z"
+    )
+    _last_timestamp = (now, formatted)
+    return formatted
+
+
 # Global agent instance
 agent: Optional[LeaveAgent] = None
 snowflake_client = None
 
+# Max sessions with their own agent; the least recently used ones are
+# dropped and start a new conversation on their next message
+SESSION_AGENT_CACHE_SIZE = 256
+
+# An agent's conversation history and caches are not thread-safe, so each
+# agent is only called while holding its lock. Every session gets its own
+# agent and lock: requests for different sessions run in parallel, requests
+# within one session run in order. Requests without a session_id share the
+# global agent and are serialized on _agent_lock.
+_agent_lock = threading.Lock()
+_session_agents: "OrderedDict[str, Tuple[LeaveAgent, threading.Lock]]" = OrderedDict()
+_session_agents_lock = threading.Lock()
+
+
+def _get_session_agent(session_id: Optional[str]) -> Tuple[LeaveAgent, threading.Lock]:
+    """
+    Get the agent serving a session, creating it on first use
+    
+    Args:
+        session_id: Session ID, or None for the shared global agent
+        
+    Returns:
+        Tuple of (agent, lock to hold while calling it)
+    """
+    if not session_id:
+        return agent, _agent_lock
+    
+    with _session_agents_lock:
+        entry = _session_agents.get(session_id)
+        if entry is not None:
+            _session_agents.move_to_end(session_id)
+            return entry
+        
+        entry = (LeaveAgent(), threading.Lock())
+        _session_agents[session_id] = entry
+        if len(_session_agents) > SESSION_AGENT_CACHE_SIZE:
+            _session_agents.popitem(last=False)
+        return entry
+
+
+def _call_agent(session_id: Optional[str], method_name: str, /, *args, **kwargs):
+    """
+    Call a method on a session's agent while holding that agent's lock
+    
+    Args:
+        session_id: Session ID selecting the agent (None for the shared one)
+        method_name: Name of the agent method to call
+        *args: Positional arguments for the method
+        **kwargs: Keyword arguments for the method
+        
+    Returns:
+        The method's return value
+    """
+    session_agent, lock = _get_session_agent(session_id)
+    with lock:
+        return getattr(session_agent, method_name)(*args, **kwargs)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -73,8 +180,12 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down Leave Policy Agent API...")
     
+    with _session_agents_lock:
+        _session_agents.clear()
+    
     if snowflake_client:
-        snowflake_client.close()
+        close_snowflake_client()
+        snowflake_client = None
         logger.info("Snowflake client closed")
 
 
@@ -83,7 +194,8 @@ app = FastAPI(
     title="Leave Policy Assistant Agent",
     description="AI agent for leave policy questions and eligibility checks",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # Add CORS middleware
@@ -154,17 +266,25 @@ async def add_process_time_header(request: Request, call_next):
     )
     
     # Record metrics
-    REQUEST_DURATION.labels(endpoint=request.url.path).observe(process_time)
-    REQUEST_COUNT.labels(
-        endpoint=request.url.path,
-        status=response.status_code
-    ).inc()
+    path = request.url.path
+    duration = _DURATION_BY_ENDPOINT.get(path)
+    if duration is None:
+        duration = REQUEST_DURATION.labels(endpoint=path)
+    duration.observe(process_time)
+    
+    key = (path, response.status_code)
+    count = _COUNT_BY_ENDPOINT_STATUS.get(key)
+    if count is None:
+        count = REQUEST_COUNT.labels(endpoint=path, status=response.status_code)
+        if path in _DURATION_BY_ENDPOINT:
+            _COUNT_BY_ENDPOINT_STATUS[key] = count
+    count.inc()
     
     return response
 
 
 # API Endpoints
-@app.get("/", response_class=JSONResponse)
+@app.get("/", response_class=FastJSONResponse)
 async def root():
     """Root endpoint"""
     return {
@@ -203,8 +323,12 @@ async def chat(request: ChatRequest):
         # Record metric
         CHAT_MESSAGES.inc()
         
-        # Process message
-        response = agent.chat(
+        # Process message in a worker thread - agent.chat does blocking
+        # LLM I/O. Only requests for the same session wait on each other.
+        response = await asyncio.to_thread(
+            _call_agent,
+            request.session_id,
+            "chat",
             message=request.message,
             session_id=request.session_id,
             user_context=request.user_context
@@ -213,7 +337,7 @@ async def chat(request: ChatRequest):
         return ChatResponse(
             response=response,
             session_id=request.session_id,
-            timestamp=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+            timestamp=_iso_now()
         )
         
     except Exception as e:
@@ -242,12 +366,12 @@ async def reset_session(session_id: str):
         )
     
     try:
-        agent.reset_conversation(session_id)
+        await asyncio.to_thread(_call_agent, session_id, "reset_conversation", session_id)
         
         return {
             "status": "success",
             "message": f"Session {session_id} reset",
-            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+            "timestamp": _iso_now()
         }
         
     except Exception as e:
@@ -271,7 +395,7 @@ async def health_check():
     Returns:
         Health status
     """
-    timestamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    timestamp = _iso_now()
     
     # Check agent
     agent_healthy = agent is not None
@@ -341,7 +465,7 @@ async def get_stats():
             "tools": list(agent.tools.keys())
         },
         "circuit_breakers": get_all_circuit_breaker_stats(),
-        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        "timestamp": _iso_now()
     }
     
     if snowflake_client:
@@ -354,12 +478,12 @@ async def get_stats():
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
     """Handle HTTP exceptions"""
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=exc.status_code,
         content={
             "error": exc.detail,
             "status_code": exc.status_code,
-            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+            "timestamp": _iso_now()
         }
     )
 
@@ -369,12 +493,12 @@ async def general_exception_handler(request: Request, exc: Exception):
     """Handle general exceptions"""
     logger.error(f"Unhandled exception: {exc}", exc_info=True)
     
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=500,
         content={
             "error": "Internal server error",
             "detail": str(exc) if os.getenv("DEBUG") else "An unexpected error occurred",
-            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+            "timestamp": _iso_now()
         }
     )
 
@@ -7,8 +7,160 @@ import logging
 import re
 from typing import Dict, Any, List
 
+try:
+    import re2
+    RE2_AVAILABLE = True
+except ImportError:
+    re2 = None
+    RE2_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Patterns are compiled once at import and shared by all instances. The
+# detection patterns target ASCII text, so they are compiled with re.ASCII
+
+# Prohibited content patterns
+_PROFANITY_RE = re.compile(
+    r'\b(damn|hell|crap)\b',  # Mild examples for demo
+    re.IGNORECASE | re.ASCII
+)
+_DISCRIMINATORY_RE = re.compile(
+    r'\b(discriminat|bias|prejudice)\b',
+    re.IGNORECASE | re.ASCII
+)
+
+# PII patterns (shouldn't appear in responses)
+_SSN_RE = re.compile(r'\b\d{3}-\d{2}-\d{4}\b', re.ASCII)
+_CC_RE = re.compile(r'\b\d{4}[\s-]?\d{4}[\s-]?\d{4}[\s-]?\d{4}\b', re.ASCII)
+
+# Formatting: missing space after sentence punctuation, or a whitespace run
+_FORMAT_RE = re.compile(r'(?P<punct>[.!?])(?P<cap>[A-Z])|(?P<ws>\s+)')
+
+
+def _format_sub(match: re.Match) -> str:
+    """Replacement for a _FORMAT_RE match"""
+    if match.lastgroup == "ws":
+        return ' '
+    return match["punct"] + ' ' + match["cap"]
+
+
+# Characters a complete response may end with
+_SENTENCE_END_CHARS = frozenset('.!?"\'')
+
+# Phrases that suggest the model is unsure
+_HALLUCINATION_MARKERS = (
+    "I don't have access to",
+    "I cannot verify",
+    "I'm not sure",
+    "I don't know"
+)
+# Matched against lowercased text
+_HALLUCINATION_RE = re.compile(
+    '|'.join(re.escape(marker.lower()) for marker in _HALLUCINATION_MARKERS)
+)
+
+_PROHIBITED_PATTERNS = {
+    "profanity": _PROFANITY_RE,
+    "discriminatory": _DISCRIMINATORY_RE
+}
+
+_PII_PATTERNS = {
+    "ssn": _SSN_RE,
+    "credit_card": _CC_RE
+}
+
+_DETECT_PATTERNS = {**_PROHIBITED_PATTERNS, **_PII_PATTERNS}
+
+# PII removal in one pass; each category has its own replacement
+_PII_REPLACEMENTS = {
+    "ssn": "[SSN REMOVED]",
+    "credit_card": "[CREDIT CARD REMOVED]"
+}
+_REMOVE_PII_RE = re.compile(
+    '|'.join(
+        f'(?P<{name}>{_PII_PATTERNS[name].pattern})' for name in _PII_REPLACEMENTS
+    ),
+    re.ASCII
+)
+
+
+def _remove_pii_sub(match: re.Match) -> str:
+    """Replacement for a _REMOVE_PII_RE match"""
+    return _PII_REPLACEMENTS[match.lastgroup]
+
+
+# Prohibited content and PII fused into one alternation (one named group
+# per category) that gates the per-category searches, as in the
+# before-model scan. Like that scan it runs on lowercased text without
+# re.IGNORECASE.
+_DETECT_LOWER_PATTERNS = {
+    name: re.compile(pattern.pattern.lower(), re.ASCII)
+    for name, pattern in _DETECT_PATTERNS.items()
+}
+_DETECT_RE = re.compile(
+    '|'.join(
+        f'(?P<{name}>{pattern.pattern})'
+        for name, pattern in _DETECT_LOWER_PATTERNS.items()
+    ),
+    re.ASCII
+)
+
+# With the optional google-re2 package installed, the same lowercased
+# patterns are searched with linear-time RE2 automata instead: the union of
+# all patterns gates the per-category searches, as with the fused re scan.
+# Like re.ASCII, RE2's \b and \d are ASCII-only, and the text is lowercased
+# the same way, so both engines detect the same categories.
+_RE2_PATTERNS = {
+    name: re2.compile(pattern.pattern)
+    for name, pattern in _DETECT_LOWER_PATTERNS.items()
+} if RE2_AVAILABLE else None
+_RE2_ANY = re2.compile(
+    '|'.join(f'(?:{pattern.pattern})' for pattern in _DETECT_LOWER_PATTERNS.values())
+) if RE2_AVAILABLE else None
+
+
+# Lowercases only ASCII letters, matching re.ASCII case folding (str.lower()
+# can turn non-ASCII characters such as 'İ' into ASCII ones)
+_ASCII_LOWER_TABLE = str.maketrans(
+    'ABCDEFGHIJKLMNOPQRSTUVWXYZ',
+    'abcdefghijklmnopqrstuvwxyz'
+)
+
+
+def _ascii_lower(text: str) -> str:
+    """Lowercase the ASCII letters in text"""
+    if text.isascii():
+        return text.lower()
+    return text.translate(_ASCII_LOWER_TABLE)
+
+
+def _detect(text: str, lowered: str = None) -> set:
+    """
+    Get the names of all pattern categories found in text
+    
+    Args:
+        text: Text to scan
+        lowered: _ascii_lower(text), if the caller already has it
+        
+    Returns:
+        Set of matched category names
+    """
+    if lowered is None:
+        lowered = _ascii_lower(text)
+    if _RE2_PATTERNS is not None:
+        if not _RE2_ANY.search(lowered):
+            return set()
+        return {name for name, pattern in _RE2_PATTERNS.items() if pattern.search(lowered)}
+    match = _DETECT_RE.search(lowered)
+    if match is None:
+        return set()
+    found = {match.lastgroup}
+    found.update(
+        name for name, pattern in _DETECT_LOWER_PATTERNS.items()
+        if name not in found and pattern.search(lowered)
+    )
+    return found
+
 
 class AfterModelCallback:
     """
@@ -22,25 +174,13 @@ class AfterModelCallback:
     - Response enhancement
     """
     
+    __slots__ = ('prohibited_patterns', 'pii_patterns')
+    
     def __init__(self):
         """Initialize after model callback"""
-        # Prohibited content patterns
-        self.prohibited_patterns = {
-            "profanity": re.compile(
-                r'\b(damn|hell|crap)\b',  # Mild examples for demo
-                re.IGNORECASE
-            ),
-            "discriminatory": re.compile(
-                r'\b(discriminat|bias|prejudice)\b',
-                re.IGNORECASE
-            )
-        }
-        
-        # PII patterns (shouldn't appear in responses)
-        self.pii_patterns = {
-            "ssn": re.compile(r'\b\d{3}-\d{2}-\d{4}\b'),
-            "credit_card": re.compile(r'\b\d{4}[\s-]?\d{4}[\s-]?\d{4}[\s-]?\d{4}\b')
-        }
+        # Shared precompiled patterns, by name
+        self.prohibited_patterns = _PROHIBITED_PATTERNS
+        self.pii_patterns = _PII_PATTERNS
         
         logger.info("AfterModelCallback initialized")
     
@@ -63,14 +203,22 @@ class AfterModelCallback:
         """
         logger.debug("AfterModelCallback processing response")
         
+        # Lowercased once for every case-insensitive check
+        lowered = _ascii_lower(response)
+        
         # Run validation checks
-        validation_results = self._validate_response(response)
+        validation_results = self._validate_response(response, lowered)
+        
+        # Single scan for prohibited content and PII
+        found = _detect(response, lowered)
         
         # Filter prohibited content
-        filtered_response = self._filter_content(response)
+        filtered_response = self._filter_content(response, found)
         
-        # Check for PII leakage
-        pii_check = self._check_pii_leakage(filtered_response)
+        # Check for PII leakage (rescan only if filtering changed the text)
+        if filtered_response != response:
+            found = _detect(filtered_response)
+        pii_check = self._check_pii_leakage(filtered_response, found)
         
         if pii_check["pii_found"]:
             logger.warning(f"PII detected in response: {pii_check['types']}")
@@ -98,85 +246,96 @@ class AfterModelCallback:
             }
         }
     
-    def _validate_response(self, response: str) -> Dict[str, Any]:
+    def _validate_response(
+        self,
+        response: str,
+        lowered: str = None
+    ) -> Dict[str, Any]:
         """
         Validate LLM response
         
         Args:
             response: Generated text
+            lowered: _ascii_lower(response), if the caller already has it
             
         Returns:
             Validation results
         """
         issues = []
+        length = len(response)
         
         # Check length
-        if len(response) < 10:
+        if length < 10:
             issues.append("Response too short")
-        
-        if len(response) > 5000:
+        elif length > 5000:
             issues.append("Response too long")
         
         # Check for incomplete sentences
-        if response and not response.rstrip().endswith(('.', '!', '?', '"', "'")):
-            issues.append("Response appears incomplete")
+        if length:
+            stripped = response.rstrip()
+            if not stripped or stripped[-1] not in _SENTENCE_END_CHARS:
+                issues.append("Response appears incomplete")
         
         # Check for hallucination markers
-        hallucination_markers = [
-            "I don't have access to",
-            "I cannot verify",
-            "I'm not sure",
-            "I don't know"
-        ]
-        
-        has_uncertainty = any(
-            marker.lower() in response.lower()
-            for marker in hallucination_markers
-        )
+        if lowered is None:
+            lowered = _ascii_lower(response)
+        has_uncertainty = _HALLUCINATION_RE.search(lowered) is not None
         
         return {
             "passed": len(issues) == 0,
             "issues": issues,
-            "length": len(response),
+            "length": length,
             "has_uncertainty": has_uncertainty
         }
     
-    def _filter_content(self, response: str) -> str:
+    def _filter_content(self, response: str, found: set = None) -> str:
         """
         Filter prohibited content from response
         
         Args:
             response: Original response
+            found: Categories already detected in response (scanned if None)
             
         Returns:
             Filtered response
         """
+        if found is None:
+            found = _detect(response)
+        
+        # Clean responses (the common case) are returned untouched
+        if found.isdisjoint(_PROHIBITED_PATTERNS):
+            return response
+        
         filtered = response
         
         # Check for prohibited patterns
-        for content_type, pattern in self.prohibited_patterns.items():
-            if pattern.search(filtered):
+        for content_type, pattern in _PROHIBITED_PATTERNS.items():
+            if content_type in found:
                 logger.warning(f"Prohibited content detected: {content_type}")
                 # Replace with asterisks
                 filtered = pattern.sub("***", filtered)
         
         return filtered
     
-    def _check_pii_leakage(self, response: str) -> Dict[str, Any]:
+    def _check_pii_leakage(
+        self,
+        response: str,
+        found: set = None
+    ) -> Dict[str, Any]:
         """
         Check if response contains PII
         
         Args:
             response: Text to check
+            found: Categories already detected in response (scanned if None)
             
         Returns:
             PII detection results
         """
-        pii_types = []
+        if found is None:
+            found = _detect(response)
         
-        for pii_type, pattern in self.pii_patterns.items():
-            if pattern.search(response):
-                pii_types.append(pii_type)
+        pii_types = [pii_type for pii_type in _PII_PATTERNS if pii_type in found]
         
         return {
             "pii_found": len(pii_types) > 0,
@@ -193,18 +352,7 @@ class AfterModelCallback:
         Returns:
             Text with PII removed
         """
-        cleaned = response
-        
-        # Remove SSN
-        cleaned = self.pii_patterns["ssn"].sub("[SSN REMOVED]", cleaned)
-        
-        # Remove credit card
-        cleaned = self.pii_patterns["credit_card"].sub(
-            "[CREDIT CARD REMOVED]",
-            cleaned
-        )
-        
-        return cleaned
+        return _REMOVE_PII_RE.sub(_remove_pii_sub, response)
     
     def _enhance_formatting(self, response: str) -> str:
         """
@@ -216,22 +364,9 @@ class AfterModelCallback:
         Returns:
             Enhanced response
         """
-        enhanced = response
-        
-        # Ensure proper spacing after punctuation
-        enhanced = re.sub(r'([.!?])([A-Z])', r'\1 \2', enhanced)
-        
-        # Remove excessive whitespace
-        enhanced = re.sub(r'\s+', ' ', enhanced)
-        
-        # Remove leading/trailing whitespace
-        enhanced = enhanced.strip()
-        
-        # Ensure consistent list formatting
-        enhanced = re.sub(r'\n-\s*', '\n- ', enhanced)
-        enhanced = re.sub(r'\n\d+\.\s*', lambda m: m.group(0), enhanced)
-        
-        return enhanced
+        # Ensure proper spacing after punctuation and collapse excessive
+        # whitespace in a single scan, then trim
+        return _FORMAT_RE.sub(_format_sub, response).strip()
     
     def _add_context(
         self,
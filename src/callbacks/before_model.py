@@ -7,8 +7,157 @@ import logging
 import re
 from typing import Dict, Any, List
 
+try:
+    import re2
+    RE2_AVAILABLE = True
+except ImportError:
+    re2 = None
+    RE2_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Patterns are compiled once at import and shared by all instances. They
+# target ASCII formats, so re.ASCII keeps \b, \d and \s (and case folding)
+# on the cheaper ASCII tables.
+
+# PII patterns
+_SSN_RE = re.compile(r'\b\d{3}-\d{2}-\d{4}\b', re.ASCII)
+_CC_RE = re.compile(r'\b\d{4}[\s-]?\d{4}[\s-]?\d{4}[\s-]?\d{4}\b', re.ASCII)
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', re.ASCII)
+_PHONE_RE = re.compile(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b', re.ASCII)
+_IP_RE = re.compile(r'\b(?:\d{1,3}\.){3}\d{1,3}\b', re.ASCII)
+
+# Malicious patterns
+_SQLI_RE = re.compile(
+    r"(\bUNION\b|\bSELECT\b|\bDROP\b|\bINSERT\b|\bUPDATE\b|\bDELETE\b)",
+    re.IGNORECASE | re.ASCII
+)
+_SCRIPT_RE = re.compile(r'<script[^>]*>.*?</script>', re.IGNORECASE | re.ASCII)
+_CMD_RE = re.compile(r'[;&|`$()]', re.ASCII)
+
+# Characters stripped from input by _sanitize_input
+_DANGEROUS_CHARS_TABLE = str.maketrans('', '', '`$;')
+
+# ASCII bytes that are not special characters (alphanumeric or whitespace),
+# deleted with bytes.translate to count the special ones in C
+_NON_SPECIAL_ASCII = bytes(
+    i for i in range(128) if chr(i).isalnum() or chr(i).isspace()
+)
+
+
+def _count_special_chars(content: str) -> int:
+    """Count characters that are neither alphanumeric nor whitespace"""
+    if content.isascii():
+        return len(content.encode('ascii').translate(None, _NON_SPECIAL_ASCII))
+    return sum(1 for c in content if not c.isalnum() and not c.isspace())
+
+
+_PII_PATTERNS = {
+    "ssn": _SSN_RE,
+    "credit_card": _CC_RE,
+    "email": _EMAIL_RE,
+    "phone": _PHONE_RE,
+    "ip_address": _IP_RE
+}
+
+_MALICIOUS_PATTERNS = {
+    "sql_injection": _SQLI_RE,
+    "script_injection": _SCRIPT_RE,
+    "command_injection": _CMD_RE
+}
+
+_DETECT_PATTERNS = {**_PII_PATTERNS, **_MALICIOUS_PATTERNS}
+
+# Masked PII categories in one alternation, in the order they used to be
+# substituted, so masking rewrites the text in a single pass
+_PII_MASKS = {
+    "ssn": "***-**-****",
+    "credit_card": "**** **** **** ****",
+    "email": None,  # Keeps the domain, see _mask_sub
+    "phone": "***-***-****"
+}
+_MASK_RE = re.compile(
+    '|'.join(
+        f'(?P<{name}>{_PII_PATTERNS[name].pattern})' for name in _PII_MASKS
+    ),
+    re.ASCII
+)
+
+
+def _mask_sub(match: re.Match) -> str:
+    """Replacement for a _MASK_RE match"""
+    mask = _PII_MASKS[match.lastgroup]
+    if mask is not None:
+        return mask
+    # Mask email (keep domain for context)
+    return f"***@{match.group().split('@')[1]}"
+
+
+# All detection patterns fused into one alternation (one named group per
+# category) so clean input, the common case, is rejected in a single scan.
+# A match only proves that its own category is present; other categories
+# may start at the same position or elsewhere, so after a hit each remaining
+# category is searched on its own. Scans run on lowercased text, so patterns
+# are built from lowercased sources (they only use lowercase escapes such as
+# \b, \d and \s) and the IGNORECASE slow path is avoided.
+_DETECT_LOWER_PATTERNS = {
+    name: re.compile(pattern.pattern.lower(), re.ASCII)
+    for name, pattern in _DETECT_PATTERNS.items()
+}
+_DETECT_RE = re.compile(
+    '|'.join(
+        f'(?P<{name}>{pattern.pattern})'
+        for name, pattern in _DETECT_LOWER_PATTERNS.items()
+    ),
+    re.ASCII
+)
+
+# With the optional google-re2 package installed, the same lowercased
+# patterns are searched with linear-time RE2 automata instead: the union of
+# all patterns gates the per-category searches, as with the fused re scan.
+# Like re.ASCII, RE2's \b and \d are ASCII-only, and the text is lowercased
+# the same way, so both engines detect the same categories.
+_RE2_PATTERNS = {
+    name: re2.compile(pattern.pattern)
+    for name, pattern in _DETECT_LOWER_PATTERNS.items()
+} if RE2_AVAILABLE else None
+_RE2_ANY = re2.compile(
+    '|'.join(f'(?:{pattern.pattern})' for pattern in _DETECT_LOWER_PATTERNS.values())
+) if RE2_AVAILABLE else None
+
+
+# Lowercases only ASCII letters, matching re.ASCII case folding (str.lower()
+# can turn non-ASCII characters such as 'İ' into ASCII ones)
+_ASCII_LOWER_TABLE = str.maketrans(
+    'ABCDEFGHIJKLMNOPQRSTUVWXYZ',
+    'abcdefghijklmnopqrstuvwxyz'
+)
+
+
+def _ascii_lower(text: str) -> str:
+    """Lowercase the ASCII letters in text"""
+    if text.isascii():
+        return text.lower()
+    return text.translate(_ASCII_LOWER_TABLE)
+
+
+def _detect(text: str) -> set:
+    """Get the names of all pattern categories found in text"""
+    lowered = _ascii_lower(text)
+    if _RE2_PATTERNS is not None:
+        if not _RE2_ANY.search(lowered):
+            return set()
+        return {name for name, pattern in _RE2_PATTERNS.items() if pattern.search(lowered)}
+    match = _DETECT_RE.search(lowered)
+    if match is None:
+        return set()
+    found = {match.lastgroup}
+    found.update(
+        name for name, pattern in _DETECT_LOWER_PATTERNS.items()
+        if name not in found and pattern.search(lowered)
+    )
+    return found
+
 
 class BeforeModelCallback:
     """
@@ -22,26 +171,13 @@ class BeforeModelCallback:
     - Rate limiting checks
     """
     
+    __slots__ = ('pii_patterns', 'malicious_patterns')
+    
     def __init__(self):
         """Initialize before model callback"""
-        # PII patterns
-        self.pii_patterns = {
-            "ssn": re.compile(r'\b\d{3}-\d{2}-\d{4}\b'),
-            "credit_card": re.compile(r'\b\d{4}[\s-]?\d{4}[\s-]?\d{4}[\s-]?\d{4}\b'),
-            "email": re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'),
-            "phone": re.compile(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b'),
-            "ip_address": re.compile(r'\b(?:\d{1,3}\.){3}\d{1,3}\b')
-        }
-        
-        # Malicious patterns
-        self.malicious_patterns = {
-            "sql_injection": re.compile(
-                r"(\bUNION\b|\bSELECT\b|\bDROP\b|\bINSERT\b|\bUPDATE\b|\bDELETE\b)",
-                re.IGNORECASE
-            ),
-            "script_injection": re.compile(r'<script[^>]*>.*?</script>', re.IGNORECASE),
-            "command_injection": re.compile(r'[;&|`$()]')
-        }
+        # Shared precompiled patterns, by name
+        self.pii_patterns = _PII_PATTERNS
+        self.malicious_patterns = _MALICIOUS_PATTERNS
         
         logger.info("BeforeModelCallback initialized")
     
@@ -51,7 +187,8 @@ class BeforeModelCallback:
         
         Args:
             messages: List of conversation messages
-            **kwargs: Additional context
+            **kwargs: Additional context; latest_user_idx may give the
+                index of the latest user message to skip searching for it
             
         Returns:
             Dictionary with processed messages and metadata
@@ -59,7 +196,10 @@ class BeforeModelCallback:
         logger.debug(f"BeforeModelCallback processing {len(messages)} messages")
         
         # Get the latest user message
-        user_message = self._get_latest_user_message(messages)
+        user_message = self._get_latest_user_message(
+            messages,
+            kwargs.get("latest_user_idx")
+        )
         
         if not user_message:
             logger.warning("No user message found in input")
@@ -72,7 +212,8 @@ class BeforeModelCallback:
             }
         
         # Run security checks
-        validation_results = self._validate_input(user_message["content"])
+        content = user_message["content"]
+        validation_results = self._validate_input(content)
         
         # If validation fails, modify the message
         if not validation_results["passed"]:
@@ -86,25 +227,16 @@ class BeforeModelCallback:
             # 3. Add a warning
             
             # For this implementation, we'll sanitize and warn
-            sanitized_content = self._sanitize_input(user_message["content"])
-            user_message["content"] = sanitized_content
-            
-            # Update message in list
-            for i, msg in enumerate(messages):
-                if msg.get("role") == "user" and msg == user_message:
-                    messages[i]["content"] = sanitized_content
-                    break
+            content = self._sanitize_input(content)
         
         # Mask PII if detected
         pii_detected = validation_results.get("pii_detected", {})
         if any(pii_detected.values()):
             logger.info(f"PII detected: {list(pii_detected.keys())}")
-            masked_content = self._mask_pii(user_message["content"])
-            
-            for i, msg in enumerate(messages):
-                if msg.get("role") == "user" and msg == user_message:
-                    messages[i]["content"] = masked_content
-                    break
+            content = self._mask_pii(content)
+        
+        # user_message is the dict inside messages, so update it in place
+        user_message["content"] = content
         
         return {
             "messages": messages,
@@ -118,12 +250,27 @@ class BeforeModelCallback:
     
     def _get_latest_user_message(
         self,
-        messages: List[Dict[str, Any]]
+        messages: List[Dict[str, Any]],
+        hint: int | None = None
     ) -> Dict[str, Any] | None:
-        """Get the most recent user message"""
-        for message in reversed(messages):
+        """
+        Get the most recent user message
+        
+        Args:
+            messages: List of conversation messages
+            hint: Index expected to hold the latest user message
+            
+        Returns:
+            The user message dict from messages, or None
+        """
+        if hint is not None and -len(messages) <= hint < len(messages):
+            message = messages[hint]
             if message.get("role") == "user":
                 return message
+        
+        for i in range(len(messages) - 1, -1, -1):
+            if messages[i].get("role") == "user":
+                return messages[i]
         return None
     
     def _validate_input(self, content: str) -> Dict[str, Any]:
@@ -138,16 +285,19 @@ class BeforeModelCallback:
         """
         issues = []
         
+        # Single scan for all PII and malicious patterns
+        found = _detect(content)
+        
         # Check for PII
         pii_detected = {}
-        for pii_type, pattern in self.pii_patterns.items():
-            if pattern.search(content):
+        for pii_type in _PII_PATTERNS:
+            if pii_type in found:
                 pii_detected[pii_type] = True
                 issues.append(f"Potential {pii_type.upper()} detected")
         
         # Check for malicious patterns
-        for attack_type, pattern in self.malicious_patterns.items():
-            if pattern.search(content):
+        for attack_type in _MALICIOUS_PATTERNS:
+            if attack_type in found:
                 issues.append(f"Potential {attack_type} detected")
         
         # Check message length
@@ -155,9 +305,7 @@ class BeforeModelCallback:
             issues.append("Message exceeds maximum length (10000 characters)")
         
         # Check for excessive special characters (potential encoding attack)
-        special_char_ratio = sum(
-            1 for c in content if not c.isalnum() and not c.isspace()
-        ) / max(len(content), 1)
+        special_char_ratio = _count_special_chars(content) / max(len(content), 1)
         
         if special_char_ratio > 0.3:
             issues.append("Excessive special characters detected")
@@ -183,18 +331,11 @@ class BeforeModelCallback:
         sanitized = content
         
         # Remove script tags
-        sanitized = re.sub(
-            r'<script[^>]*>.*?</script>',
-            '[REMOVED]',
-            sanitized,
-            flags=re.IGNORECASE
-        )
+        sanitized = _SCRIPT_RE.sub('[REMOVED]', sanitized)
         
         # Remove potentially dangerous characters for command injection
         # (but preserve normal punctuation)
-        dangerous_chars = ['`', '$', ';']
-        for char in dangerous_chars:
-            sanitized = sanitized.replace(char, '')
+        sanitized = sanitized.translate(_DANGEROUS_CHARS_TABLE)
         
         # Limit length
         if len(sanitized) > 10000:
@@ -212,28 +353,7 @@ class BeforeModelCallback:
         Returns:
             Text with PII masked
         """
-        masked = content
-        
-        # Mask SSN
-        masked = self.pii_patterns["ssn"].sub("***-**-****", masked)
-        
-        # Mask credit card
-        masked = self.pii_patterns["credit_card"].sub("**** **** **** ****", masked)
-        
-        # Mask email (keep domain for context)
-        def mask_email(match):
-            email = match.group(0)
-            parts = email.split('@')
-            if len(parts) == 2:
-                return f"***@{parts[1]}"
-            return "***@***.***"
-        
-        masked = self.pii_patterns["email"].sub(mask_email, masked)
-        
-        # Mask phone
-        masked = self.pii_patterns["phone"].sub("***-***-****", masked)
-        
-        return masked
+        return _MASK_RE.sub(_mask_sub, content)
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get callback statistics"""
@@ -56,31 +56,39 @@ class CircuitBreaker:
         self._state = CircuitState.CLOSED
         self._failure_count = 0
         self._success_count = 0
+        # time.monotonic() of the last failure
         self._last_failure_time: Optional[float] = None
-        self._lock = threading.RLock()
+        self._lock = threading.Lock()
         
         logger.info(
-            f"Circuit breaker '{name}' initialized: "
-            f"failure_threshold={failure_threshold}, timeout={timeout}s"
+            "Circuit breaker '%s' initialized: failure_threshold=%d, timeout=%ss",
+            name, failure_threshold, timeout
         )
     
     @property
     def state(self) -> CircuitState:
         """Get current state"""
+        # Lock-free read; the lock is only taken for the OPEN -> HALF_OPEN
+        # transition
+        state = self._state
+        if state is not CircuitState.OPEN or not self._should_attempt_reset():
+            return state
+        
         with self._lock:
-            # Check if we should transition from OPEN to HALF_OPEN
-            if self._state == CircuitState.OPEN and self._should_attempt_reset():
+            # Re-check, another thread may have transitioned already
+            if self._state is CircuitState.OPEN:
                 self._state = CircuitState.HALF_OPEN
                 self._success_count = 0
-                logger.info(f"Circuit breaker '{self.name}' entering HALF_OPEN state")
+                logger.info("Circuit breaker '%s' entering HALF_OPEN state", self.name)
             
             return self._state
     
     def _should_attempt_reset(self) -> bool:
         """Check if enough time has passed to attempt recovery"""
-        if self._last_failure_time is None:
+        last_failure_time = self._last_failure_time
+        if last_failure_time is None:
             return False
-        return time.time() - self._last_failure_time >= self.timeout
+        return time.monotonic() - last_failure_time >= self.timeout
     
     def call(self, func: Callable, *args, **kwargs) -> Any:
         """
@@ -102,9 +110,7 @@ class CircuitBreaker:
         
         # Reject if circuit is open
         if current_state == CircuitState.OPEN:
-            logger.warning(
-                f"Circuit breaker '{self.name}' is OPEN, rejecting call"
-            )
+            logger.warning("Circuit breaker '%s' is OPEN, rejecting call", self.name)
             raise CircuitBreakerError(
                 f"Circuit breaker '{self.name}' is open. "
                 f"Service unavailable, try again later."
@@ -122,30 +128,37 @@ class CircuitBreaker:
     
     def _on_success(self):
         """Handle successful call"""
+        # Happy path: closed circuit, lock-free (and write-free when there
+        # were no failures to clear)
+        if self._state is CircuitState.CLOSED:
+            if self._failure_count:
+                self._failure_count = 0
+            return
+        
         with self._lock:
             self._failure_count = 0
             
             if self._state == CircuitState.HALF_OPEN:
                 self._success_count += 1
                 logger.debug(
-                    f"Circuit breaker '{self.name}' success in HALF_OPEN: "
-                    f"{self._success_count}/{self.success_threshold}"
+                    "Circuit breaker '%s' success in HALF_OPEN: %d/%d",
+                    self.name, self._success_count, self.success_threshold
                 )
                 
                 if self._success_count >= self.success_threshold:
                     self._state = CircuitState.CLOSED
                     self._success_count = 0
-                    logger.info(f"Circuit breaker '{self.name}' closed - service recovered")
+                    logger.info("Circuit breaker '%s' closed - service recovered", self.name)
     
     def _on_failure(self):
         """Handle failed call"""
         with self._lock:
             self._failure_count += 1
-            self._last_failure_time = time.time()
+            self._last_failure_time = time.monotonic()
             
             logger.warning(
-                f"Circuit breaker '{self.name}' failure: "
-                f"{self._failure_count}/{self.failure_threshold}"
+                "Circuit breaker '%s' failure: %d/%d",
+                self.name, self._failure_count, self.failure_threshold
             )
             
             # Open circuit if threshold reached
@@ -153,8 +166,8 @@ class CircuitBreaker:
                 if self._state != CircuitState.OPEN:
                     self._state = CircuitState.OPEN
                     logger.error(
-                        f"Circuit breaker '{self.name}' opened after "
-                        f"{self._failure_count} failures"
+                        "Circuit breaker '%s' opened after %d failures",
+                        self.name, self._failure_count
                     )
             
             # If in HALF_OPEN and still failing, back to OPEN
@@ -162,7 +175,8 @@ class CircuitBreaker:
                 self._state = CircuitState.OPEN
                 self._success_count = 0
                 logger.error(
-                    f"Circuit breaker '{self.name}' reopened during recovery attempt"
+                    "Circuit breaker '%s' reopened during recovery attempt",
+                    self.name
                 )
     
     def reset(self):
@@ -172,11 +186,16 @@ class CircuitBreaker:
             self._failure_count = 0
             self._success_count = 0
             self._last_failure_time = None
-            logger.info(f"Circuit breaker '{self.name}' manually reset")
+            logger.info("Circuit breaker '%s' manually reset", self.name)
     
     def get_stats(self) -> dict:
         """Get current statistics"""
         with self._lock:
+            # Report the last failure as wall-clock time
+            last_failure_time = self._last_failure_time
+            if last_failure_time is not None:
+                last_failure_time = time.time() - (time.monotonic() - last_failure_time)
+            
             return {
                 "name": self.name,
                 "state": self._state.value,
@@ -184,7 +203,7 @@ class CircuitBreaker:
                 "success_count": self._success_count,
                 "failure_threshold": self.failure_threshold,
                 "timeout": self.timeout,
-                "last_failure_time": self._last_failure_time
+                "last_failure_time": last_failure_time
             }
 
 
@@ -192,29 +211,39 @@ def circuit_breaker(
     failure_threshold: int = 5,
     timeout: int = 60,
     success_threshold: int = 2,
-    name: str = "default"
+    name: Optional[str] = None
 ):
     """
     Decorator to add circuit breaker protection to a function
     
+    The breaker is registered under name, or the decorated function's
+    qualified name if none is given, so it shows up in
+    get_all_circuit_breaker_stats().
+    
     Usage:
         @circuit_breaker(failure_threshold=3, timeout=30, name="my_service")
         def call_external_service():
             # your code here
             pass
     """
-    # Create circuit breaker instance
-    cb = CircuitBreaker(
-        failure_threshold=failure_threshold,
-        timeout=timeout,
-        success_threshold=success_threshold,
-        name=name
-    )
-    
     def decorator(func: Callable) -> Callable:
+        breaker_name = name or f"{func.__module__}.{func.__qualname__}"
+        
+        # Create circuit breaker instance
+        cb = CircuitBreaker(
+            failure_threshold=failure_threshold,
+            timeout=timeout,
+            success_threshold=success_threshold,
+            name=breaker_name
+        )
+        register_circuit_breaker(breaker_name, cb)
+        
+        # Bound once so each call skips the attribute lookup
+        protected_call = cb.call
+        
         @wraps(func)
         def wrapper(*args, **kwargs):
-            return cb.call(func, *args, **kwargs)
+            return protected_call(func, *args, **kwargs)
         
         # Attach circuit breaker instance for access
         wrapper.circuit_breaker = cb
@@ -223,9 +252,12 @@ def circuit_breaker(
     return decorator
 
 
-# Global registry of circuit breakers
+# Global registry of circuit breakers. Writers hold the lock and publish a
+# fresh tuple of the registered breakers, so readers of the snapshot never
+# need the lock.
 _circuit_breakers: dict[str, CircuitBreaker] = {}
-_registry_lock = threading.RLock()
+_circuit_breakers_snapshot: tuple[CircuitBreaker, ...] = ()
+_registry_lock = threading.Lock()
 
 
 def get_circuit_breaker(name: str) -> Optional[CircuitBreaker]:
@@ -236,12 +268,14 @@ def get_circuit_breaker(name: str) -> Optional[CircuitBreaker]:
 
 def register_circuit_breaker(name: str, circuit_breaker: CircuitBreaker):
     """Register a circuit breaker in global registry"""
+    global _circuit_breakers_snapshot
+    
     with _registry_lock:
         _circuit_breakers[name] = circuit_breaker
-        logger.debug(f"Registered circuit breaker: {name}")
+        _circuit_breakers_snapshot = tuple(_circuit_breakers.values())
+        logger.debug("Registered circuit breaker: %s", name)
 
 
 def get_all_circuit_breaker_stats() -> list[dict]:
     """Get stats for all registered circuit breakers"""
-    with _registry_lock:
-        return [cb.get_stats() for cb in _circuit_breakers.values()]
\ No newline at end of file
+    return [cb.get_stats() for cb in _circuit_breakers_snapshot]
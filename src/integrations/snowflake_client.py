@@ -4,8 +4,12 @@ Supports both real Snowflake connection and mock mode for testing
 """
 
 import os
+import time
+import atexit
 import logging
-from typing import Optional, Dict, Any, List
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime
 
 from .circuit_breaker import CircuitBreaker, CircuitBreakerError, register_circuit_breaker
@@ -15,17 +19,81 @@ logger = logging.getLogger(__name__)
 # Try to import Snowflake, but allow mock mode if not available
 try:
     from snowflake.snowpark import Session
-    from snowflake.snowpark.exceptions import SnowparkSQLException
+    from snowflake.snowpark.exceptions import SnowparkClientException, SnowparkSQLException
+    from snowflake.connector.errors import Error as SnowflakeConnectorError
     SNOWFLAKE_AVAILABLE = True
 except ImportError:
     logger.warning("Snowflake Snowpark not installed, using mock mode only")
     SNOWFLAKE_AVAILABLE = False
-    SnowparkSQLException = Exception
+    Session = None
+    
+    class _SnowflakeUnavailable(Exception):
+        """Stand-in for the Snowflake error types; never raised without Snowflake"""
+    
+    SnowparkSQLException = SnowparkClientException = SnowflakeConnectorError = _SnowflakeUnavailable
+
+# Failures a real query is expected to raise (open circuit, SQL/client
+# errors, connection errors); anything else propagates
+SNOWFLAKE_QUERY_ERRORS = (CircuitBreakerError, SnowparkClientException, SnowflakeConnectorError)
 
 
 # Import mock employee data
 from config.leave_policies import MOCK_EMPLOYEES
 
+# Mock employees grouped by country, built once
+_MOCK_BY_COUNTRY: Dict[str, List[Any]] = {}
+for _employee in MOCK_EMPLOYEES.values():
+    _MOCK_BY_COUNTRY.setdefault(_employee["country"], []).append(_employee)
+del _employee
+
+# Max entries per query result cache
+QUERY_CACHE_SIZE = 1024
+
+# Seconds a cached query result stays valid
+QUERY_CACHE_TTL = 60
+
+# Min seconds between liveness checks of the pinned session
+SESSION_HEALTH_INTERVAL = 30
+
+# Employee columns selected by every query
+_EMPLOYEE_COLUMNS = (
+    "employee_id, name, country, department, join_date, "
+    "tenure_months, leave_balance"
+)
+
+# Bind parameters keep the SQL text identical across lookups, so Snowflake
+# can reuse the compiled plan and cached results
+_EMPLOYEE_BY_ID_QUERY = (
+    f"SELECT {_EMPLOYEE_COLUMNS} FROM employees WHERE employee_id = ? LIMIT 1"
+)
+_EMPLOYEES_BY_COUNTRY_QUERY = (
+    f"SELECT {_EMPLOYEE_COLUMNS} FROM employees WHERE country = ?"
+)
+
+
+# Employee dict keys, in _EMPLOYEE_COLUMNS order
+_EMPLOYEE_KEYS = tuple(column.strip() for column in _EMPLOYEE_COLUMNS.split(","))
+
+
+def _row_to_employee(row) -> Dict[str, Any]:
+    """
+    Convert a Snowpark row of _EMPLOYEE_COLUMNS to an employee dict
+    
+    Rows are tuples in SELECT order, so values are paired with the
+    lowercase keys positionally in one pass (leave_balance is the
+    JSON/VARIANT column).
+    """
+    return dict(zip(_EMPLOYEE_KEYS, row))
+
+
+def _copy_employee(employee: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy an employee record, including its nested leave balances"""
+    employee = dict(employee)
+    leave_balance = employee.get("leave_balance")
+    if isinstance(leave_balance, dict):
+        employee["leave_balance"] = dict(leave_balance)
+    return employee
+
 
 class SnowflakeClient:
     """
@@ -45,12 +113,16 @@ class SnowflakeClient:
         SNOWFLAKE_SCHEMA: Schema name
         SNOWFLAKE_WAREHOUSE: Warehouse name
         USE_MOCK_SNOWFLAKE: Set to 'true' to use mock data
+        SNOWFLAKE_FALLBACK_TO_MOCK: Set to 'false' to raise query errors
+            instead of answering from mock data (default 'true')
     """
     
     def __init__(
         self,
         use_mock: bool = None,
-        circuit_breaker_config: Optional[Dict[str, Any]] = None
+        circuit_breaker_config: Optional[Dict[str, Any]] = None,
+        cache_ttl: float = QUERY_CACHE_TTL,
+        fallback_to_mock: bool = None
     ):
         """
         Initialize Snowflake client
@@ -58,26 +130,30 @@ class SnowflakeClient:
         Args:
             use_mock: Force mock mode (overrides env var)
             circuit_breaker_config: Custom circuit breaker settings
+            cache_ttl: Seconds to reuse Snowflake query results (0 disables)
+            fallback_to_mock: Serve mock data when a real query fails
+                (overrides env var)
         """
         # Determine if we should use mock mode
         self.use_mock = use_mock if use_mock is not None else (
             os.getenv("USE_MOCK_SNOWFLAKE", "false").lower() == "true"
         )
-        
-        # Initialize circuit breaker
-        cb_config = circuit_breaker_config or {}
-        self.circuit_breaker = CircuitBreaker(
-            failure_threshold=cb_config.get("failure_threshold", 5),
-            timeout=cb_config.get("timeout", 60),
-            success_threshold=cb_config.get("success_threshold", 2),
-            name="snowflake_client"
+        self._fallback_to_mock = fallback_to_mock if fallback_to_mock is not None else (
+            os.getenv("SNOWFLAKE_FALLBACK_TO_MOCK", "true").lower() == "true"
         )
         
-        # Register in global registry
-        register_circuit_breaker("snowflake_client", self.circuit_breaker)
-        
         self.session: Optional[Session] = None
         self._connection_params = None
+        self._last_health_check = 0.0
+        
+        # LRU + TTL caches of real query results:
+        # key -> (expiry in time.monotonic(), result)
+        self._cache_ttl = cache_ttl
+        self._employee_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._country_cache: "OrderedDict[str, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
         
         if not self.use_mock:
             if not SNOWFLAKE_AVAILABLE:
@@ -90,6 +166,21 @@ class SnowflakeClient:
                 logger.info("Snowflake client initialized (real mode)")
         else:
             logger.info("Snowflake client initialized (mock mode)")
+        
+        # Circuit breaker only guards real Snowflake calls; mock mode never
+        # goes through it, so none is created or registered there
+        self.circuit_breaker: Optional[CircuitBreaker] = None
+        if not self.use_mock:
+            cb_config = circuit_breaker_config or {}
+            self.circuit_breaker = CircuitBreaker(
+                failure_threshold=cb_config.get("failure_threshold", 5),
+                timeout=cb_config.get("timeout", 60),
+                success_threshold=cb_config.get("success_threshold", 2),
+                name="snowflake_client"
+            )
+            
+            # Register in global registry
+            register_circuit_breaker("snowflake_client", self.circuit_breaker)
     
     def _setup_connection_params(self):
         """Setup Snowflake connection parameters from environment"""
@@ -106,8 +197,9 @@ class SnowflakeClient:
         
         if missing_vars:
             logger.warning(
-                f"Missing Snowflake environment variables: {missing_vars}. "
-                "Falling back to mock mode."
+                "Missing Snowflake environment variables: %s. "
+                "Falling back to mock mode.",
+                missing_vars
             )
             self.use_mock = True
             return
@@ -122,13 +214,37 @@ class SnowflakeClient:
         }
     
     def _get_session(self) -> Session:
-        """Get or create Snowflake session"""
-        if self.session is None:
-            if self._connection_params is None:
-                raise ValueError("Snowflake connection not configured")
+        """
+        Get the pinned Snowflake session, creating it if needed
+        
+        The session is reused for the process lifetime. At most every
+        SESSION_HEALTH_INTERVAL seconds it is checked with SELECT 1 and
+        rebuilt only if that fails.
+        """
+        now = time.monotonic()
+        
+        if self.session is not None:
+            if now - self._last_health_check < SESSION_HEALTH_INTERVAL:
+                return self.session
             
-            logger.info("Creating new Snowflake session")
-            self.session = Session.builder.configs(self._connection_params).create()
+            try:
+                self.session.sql("SELECT 1").collect()
+                self._last_health_check = now
+                return self.session
+            except Exception as e:
+                logger.warning("Snowflake session is stale, reconnecting: %s", e)
+                try:
+                    self.session.close()
+                except Exception:
+                    pass
+                self.session = None
+        
+        if self._connection_params is None:
+            raise ValueError("Snowflake connection not configured")
+        
+        logger.info("Creating new Snowflake session")
+        self.session = Session.builder.configs(self._connection_params).create()
+        self._last_health_check = now
         
         return self.session
     
@@ -143,83 +259,148 @@ class SnowflakeClient:
             Employee data dict or None if not found
             
         Raises:
-            CircuitBreakerError: If circuit is open
+            CircuitBreakerError: If circuit is open and mock fallback is off
         """
         if self.use_mock:
             return self._get_employee_mock(employee_id)
         
+        cached = self._cache_get(self._employee_cache, employee_id)
+        if cached is not None:
+            return _copy_employee(cached)
+        
         try:
-            return self.circuit_breaker.call(
+            employee = self.circuit_breaker.call(
                 self._query_employee_real,
                 employee_id
             )
-        except CircuitBreakerError:
-            logger.error(
-                f"Circuit breaker open, falling back to mock data for {employee_id}"
-            )
+            if employee is not None:
+                self._cache_put(self._employee_cache, employee_id, _copy_employee(employee))
+                return _copy_employee(employee)
+            return None
+        except SNOWFLAKE_QUERY_ERRORS as e:
+            if not self._fallback_to_mock:
+                raise
+            if isinstance(e, CircuitBreakerError):
+                logger.error(
+                    "Circuit breaker open, falling back to mock data for %s",
+                    employee_id
+                )
+            else:
+                logger.error("Error querying Snowflake: %s", e)
             # Graceful degradation - use mock data
             return self._get_employee_mock(employee_id)
-        except Exception as e:
-            logger.error(f"Error querying Snowflake: {e}")
+    
+    def get_employees_by_ids(self, employee_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get several employees with a single Snowflake round trip
+        
+        Args:
+            employee_ids: Employee identifiers (duplicates are ignored)
+            
+        Returns:
+            Map of employee ID to employee data for the IDs that exist
+        """
+        ids = list(dict.fromkeys(employee_ids))
+        
+        if self.use_mock:
+            return self._get_employees_mock(ids)
+        
+        employees = {}
+        missing = []
+        for employee_id in ids:
+            cached = self._cache_get(self._employee_cache, employee_id)
+            if cached is not None:
+                employees[employee_id] = _copy_employee(cached)
+            else:
+                missing.append(employee_id)
+        
+        if not missing:
+            return employees
+        
+        try:
+            fetched = self.circuit_breaker.call(
+                self._query_employees_by_ids_real,
+                missing
+            )
+        except SNOWFLAKE_QUERY_ERRORS as e:
+            if not self._fallback_to_mock:
+                raise
+            logger.error("Error querying employees by ID: %s", e)
             # Fallback to mock data
-            return self._get_employee_mock(employee_id)
+            employees.update(self._get_employees_mock(missing))
+            return employees
+        
+        for employee_id, employee in fetched.items():
+            self._cache_put(self._employee_cache, employee_id, _copy_employee(employee))
+            employees[employee_id] = _copy_employee(employee)
+        
+        return employees
+    
+    def _get_employees_mock(self, employee_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get several employees from mock data"""
+        return {
+            employee_id: _copy_employee(MOCK_EMPLOYEES[employee_id])
+            for employee_id in employee_ids
+            if employee_id in MOCK_EMPLOYEES
+        }
     
     def _get_employee_mock(self, employee_id: str) -> Optional[Dict[str, Any]]:
         """Get employee from mock data"""
-        logger.debug(f"Fetching employee {employee_id} from mock data")
+        logger.debug("Fetching employee %s from mock data", employee_id)
         employee = MOCK_EMPLOYEES.get(employee_id)
         
         if employee:
-            return dict(employee)  # Return a copy
+            return _copy_employee(employee)  # Return a copy, like real mode
         return None
     
     def _query_employee_real(self, employee_id: str) -> Optional[Dict[str, Any]]:
         """Query employee from real Snowflake database"""
-        logger.debug(f"Querying employee {employee_id} from Snowflake")
+        logger.debug("Querying employee %s from Snowflake", employee_id)
         
         session = self._get_session()
         
-        query = f"""
-        SELECT 
-            employee_id,
-            name,
-            country,
-            department,
-            join_date,
-            tenure_months,
-            leave_balance
-        FROM employees
-        WHERE employee_id = '{employee_id}'
-        LIMIT 1
-        """
-        
         try:
-            result = session.sql(query).collect()
+            result = session.sql(_EMPLOYEE_BY_ID_QUERY, params=[employee_id]).collect()
             
             if not result:
-                logger.debug(f"Employee {employee_id} not found in Snowflake")
+                logger.debug("Employee %s not found in Snowflake", employee_id)
                 return None
             
-            row = result[0]
-            
-            # Convert to dict
-            employee_data = {
-                "employee_id": row["EMPLOYEE_ID"],
-                "name": row["NAME"],
-                "country": row["COUNTRY"],
-                "department": row["DEPARTMENT"],
-                "join_date": row["JOIN_DATE"],
-                "tenure_months": row["TENURE_MONTHS"],
-                "leave_balance": row["LEAVE_BALANCE"]  # Assuming JSON/VARIANT type
-            }
+            employee_data = _row_to_employee(result[0])
             
-            logger.debug(f"Successfully fetched employee {employee_id}")
+            logger.debug("Successfully fetched employee %s", employee_id)
             return employee_data
             
         except SnowparkSQLException as e:
-            logger.error(f"Snowflake SQL error: {e}")
+            logger.error("Snowflake SQL error: %s", e)
+            # Check the session before its next use
+            self._last_health_check = 0.0
             raise
     
+    def _query_employees_by_country_mock(self, country: str) -> List[Dict[str, Any]]:
+        """Get all employees in a country from mock data"""
+        return [_copy_employee(emp) for emp in _MOCK_BY_COUNTRY.get(country, ())]
+    
+    def _query_employees_by_ids_real(
+        self,
+        employee_ids: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Query several employees from Snowflake with one IN (...) query"""
+        session = self._get_session()
+        
+        placeholders = ", ".join("?" * len(employee_ids))
+        query = (
+            f"SELECT {_EMPLOYEE_COLUMNS} FROM employees "
+            f"WHERE employee_id IN ({placeholders})"
+        )
+        
+        results = session.sql(query, params=employee_ids).collect()
+        
+        return {
+            employee["employee_id"]: employee
+            for employee in map(_row_to_employee, results)
+        }
+    
     def query_employees_by_country(self, country: str) -> List[Dict[str, Any]]:
         """
         Get all employees in a country
@@ -231,55 +412,85 @@ class SnowflakeClient:
             List of employee dicts
         """
         if self.use_mock:
-            return [
-                dict(emp) for emp in MOCK_EMPLOYEES.values()
-                if emp["country"] == country
-            ]
+            return self._query_employees_by_country_mock(country)
+        
+        cached = self._cache_get(self._country_cache, country)
+        if cached is not None:
+            return [_copy_employee(emp) for emp in cached]
         
         try:
-            return self.circuit_breaker.call(
+            employees = self.circuit_breaker.call(
                 self._query_employees_by_country_real,
                 country
             )
-        except (CircuitBreakerError, Exception) as e:
-            logger.error(f"Error querying employees by country: {e}")
+            self._cache_put(
+                self._country_cache,
+                country,
+                [_copy_employee(emp) for emp in employees]
+            )
+            return [_copy_employee(emp) for emp in employees]
+        except SNOWFLAKE_QUERY_ERRORS as e:
+            if not self._fallback_to_mock:
+                raise
+            logger.error("Error querying employees by country: %s", e)
             # Fallback to mock
-            return [
-                dict(emp) for emp in MOCK_EMPLOYEES.values()
-                if emp["country"] == country
-            ]
+            return self._query_employees_by_country_mock(country)
     
     def _query_employees_by_country_real(self, country: str) -> List[Dict[str, Any]]:
         """Query employees by country from Snowflake"""
         session = self._get_session()
         
-        query = f"""
-        SELECT 
-            employee_id,
-            name,
-            country,
-            department,
-            join_date,
-            tenure_months,
-            leave_balance
-        FROM employees
-        WHERE country = '{country}'
+        # Stream rows instead of collect()ing them into a list first
+        rows = session.sql(
+            _EMPLOYEES_BY_COUNTRY_QUERY,
+            params=[country]
+        ).to_local_iterator()
+        
+        return [_row_to_employee(row) for row in rows]
+    
+    def _cache_get(self, cache: OrderedDict, key: str) -> Any:
         """
+        Get an unexpired cached query result
         
-        results = session.sql(query).collect()
-        
-        return [
-            {
-                "employee_id": row["EMPLOYEE_ID"],
-                "name": row["NAME"],
-                "country": row["COUNTRY"],
-                "department": row["DEPARTMENT"],
-                "join_date": row["JOIN_DATE"],
-                "tenure_months": row["TENURE_MONTHS"],
-                "leave_balance": row["LEAVE_BALANCE"]
-            }
-            for row in results
-        ]
+        Args:
+            cache: One of the query result caches
+            key: Query key
+            
+        Returns:
+            Cached result, or None on a miss
+        """
+        with self._cache_lock:
+            entry = cache.get(key)
+            if entry is not None:
+                if time.monotonic() < entry[0]:
+                    cache.move_to_end(key)
+                    self._cache_hits += 1
+                    return entry[1]
+                del cache[key]
+            self._cache_misses += 1
+            return None
+    
+    def _cache_put(self, cache: OrderedDict, key: str, value: Any):
+        """Cache a query result, evicting the least recently used entry"""
+        if self._cache_ttl <= 0:
+            return
+        
+        with self._cache_lock:
+            cache[key] = (time.monotonic() + self._cache_ttl, value)
+            cache.move_to_end(key)
+            if len(cache) > QUERY_CACHE_SIZE:
+                cache.popitem(last=False)
+    
+    def invalidate_employee(self, employee_id: str):
+        """Drop a cached employee record"""
+        with self._cache_lock:
+            self._employee_cache.pop(employee_id, None)
+    
+    def clear_cache(self):
+        """Drop all cached query results"""
+        with self._cache_lock:
+            self._employee_cache.clear()
+            self._country_cache.clear()
     
     def health_check(self) -> bool:
         """
@@ -297,7 +508,7 @@ class SnowflakeClient:
             logger.debug("Snowflake health check passed")
             return True
         except Exception as e:
-            logger.error(f"Snowflake health check failed: {e}")
+            logger.error("Snowflake health check failed: %s", e)
             return False
     
     def close(self):
@@ -311,8 +522,16 @@ class SnowflakeClient:
         """Get client statistics"""
         return {
             "mode": "mock" if self.use_mock else "real",
-            "circuit_breaker": self.circuit_breaker.get_stats(),
-            "session_active": self.session is not None
+            "circuit_breaker": (
+                self.circuit_breaker.get_stats() if self.circuit_breaker else None
+            ),
+            "session_active": self.session is not None,
+            "cache": {
+                "hits": self._cache_hits,
+                "misses": self._cache_misses,
+                "employees": len(self._employee_cache),
+                "countries": len(self._country_cache)
+            }
         }
     
     def __enter__(self):
@@ -326,13 +545,39 @@ class SnowflakeClient:
 
 # Global singleton instance
 _snowflake_client: Optional[SnowflakeClient] = None
+_snowflake_client_lock = threading.Lock()
 
 
 def get_snowflake_client() -> SnowflakeClient:
     """Get or create global Snowflake client instance"""
     global _snowflake_client
     
+    # Double-checked so only the first calls contend for the lock
     if _snowflake_client is None:
-        _snowflake_client = SnowflakeClient()
+        with _snowflake_client_lock:
+            if _snowflake_client is None:
+                _snowflake_client = SnowflakeClient()
     
-    return _snowflake_client
\ No newline at end of file
+    return _snowflake_client
+
+
+def close_snowflake_client() -> None:
+    """
+    Close the global Snowflake client's session and drop the instance
+    
+    Registered with atexit so the session is closed cleanly rather than
+    dropped at interpreter exit; the API also calls it on shutdown.
+    """
+    global _snowflake_client
+    
+    with _snowflake_client_lock:
+        client, _snowflake_client = _snowflake_client, None
+    
+    if client is not None:
+        try:
+            client.close()
+        except Exception as e:
+            logger.warning("Error closing Snowflake session: %s", e)
+
+
+atexit.register(close_snowflake_client)
@@ -1,12 +1,12 @@
 """Tools package for the agent"""
 
 from .leave_policy_tool import LeavePolicyTool, leave_policy_tool, format_policy_for_display
-from .eligibility_tool import EligibilityTool, eligibility_tool
+from .eligibility_tool import EligibilityTool, get_eligibility_tool
 
 __all__ = [
     'LeavePolicyTool',
     'leave_policy_tool',
     'format_policy_for_display',
     'EligibilityTool',
-    'eligibility_tool'
-]
\ No newline at end of file
+    'get_eligibility_tool'
+]
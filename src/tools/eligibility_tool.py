@@ -3,15 +3,75 @@ Leave Eligibility Tool - Checks if employee is eligible for leave
 """
 
 import logging
-from typing import Optional, Dict, Any
-from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Optional, Dict, Any, Union
+from datetime import date, datetime
 
 from config.leave_policies import get_leave_policy
-from src.integrations.snowflake_client import get_snowflake_client
+from src.integrations.snowflake_client import get_snowflake_client, SNOWFLAKE_QUERY_ERRORS
 
 logger = logging.getLogger(__name__)
 
 
+def _parse_start_date(start_date: str) -> Union[date, ValueError]:
+    """
+    Parse a YYYY-MM-DD start date
+    
+    Args:
+        start_date: Date string from the request
+        
+    Returns:
+        The parsed date, or the ValueError describing why it is invalid
+    """
+    # date.fromisoformat is much faster than strptime, but it also accepts
+    # other ISO forms (e.g. week dates like 2025-W01-1), so it only takes
+    # strings already shaped like YYYY-MM-DD. strptime handles the rest,
+    # including the unpadded forms it always accepted (e.g. 2025-1-5), and
+    # produces the error for anything invalid.
+    if (
+        len(start_date) == 10
+        and start_date[4] == start_date[7] == "-"
+        and start_date.isascii()
+        and (start_date[:4] + start_date[5:7] + start_date[8:]).isdigit()
+    ):
+        try:
+            return date.fromisoformat(start_date)
+        except ValueError:
+            pass
+    try:
+        return datetime.strptime(start_date, "%Y-%m-%d").date()
+    except ValueError as e:
+        return e
+
+
+# Month abbreviations as used in blackout periods (e.g. "Dec 20-31")
+_MONTHS = {
+    name: number for number, name in enumerate(
+        ("Jan", "Feb", "Mar", "Apr", "May", "Jun",
+         "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"),
+        start=1
+    )
+}
+
+
+@lru_cache(maxsize=64)
+def _blackout_month(period: str) -> Optional[int]:
+    """
+    Get the month a blackout period falls in, parsed once per period
+    
+    Args:
+        period: Blackout period such as "Dec 20-31"
+        
+    Returns:
+        Month number, or None if the period names no month
+    """
+    for token in period.split():
+        month = _MONTHS.get(token[:3].title())
+        if month is not None:
+            return month
+    return None
+
+
 class EligibilityTool:
     """
     Tool for checking leave eligibility
@@ -46,6 +106,7 @@ class EligibilityTool:
     def __init__(self):
         """Initialize eligibility tool"""
         self.snowflake_client = get_snowflake_client()
+        self._schema = self._build_schema()
         logger.info("EligibilityTool initialized")
     
     def __call__(
@@ -68,13 +129,23 @@ class EligibilityTool:
             Eligibility result with details
         """
         logger.info(
-            f"Checking eligibility: employee={employee_id}, "
-            f"leave_type={leave_type}, start_date={start_date}, "
-            f"days={days_requested}"
+            "Checking eligibility: employee=%s, leave_type=%s, "
+            "start_date=%s, days=%s",
+            employee_id, leave_type, start_date, days_requested
         )
         
-        # Get employee data
-        employee = self.snowflake_client.get_employee_by_id(employee_id)
+        # Get employee data; query errors only surface when the client's
+        # mock fallback is disabled
+        try:
+            employee = self.snowflake_client.get_employee_by_id(employee_id)
+        except SNOWFLAKE_QUERY_ERRORS as e:
+            logger.error("Employee lookup failed for %s: %s", employee_id, e)
+            return {
+                "success": False,
+                "eligible": False,
+                "error": "Employee data is temporarily unavailable",
+                "employee_id": employee_id
+            }
         
         if not employee:
             return {
@@ -101,17 +172,21 @@ class EligibilityTool:
         # Get the specific policy details
         policy_details = list(policy.values())[0]
         
+        # Parse the start date once for every date-based check
+        start = _parse_start_date(start_date) if start_date else None
+        
         # Perform eligibility checks
         checks = self._perform_eligibility_checks(
             employee,
             leave_type,
             policy_details,
             start_date,
-            days_requested
+            days_requested,
+            start
         )
         
         # Determine overall eligibility
-        eligible = all(check["passed"] for check in checks["checks"])
+        eligible = not checks["reasons"]
         
         response = {
             "success": True,
@@ -125,13 +200,11 @@ class EligibilityTool:
         }
         
         if not eligible:
-            response["reasons"] = [
-                check["reason"] for check in checks["checks"]
-                if not check["passed"]
-            ]
+            response["reasons"] = checks["reasons"]
         
         logger.info(
-            f"Eligibility check complete: eligible={eligible} for {employee_id}"
+            "Eligibility check complete: eligible=%s for %s",
+            eligible, employee_id
         )
         
         return response
@@ -142,74 +215,87 @@ class EligibilityTool:
         leave_type: str,
         policy: Dict[str, Any],
         start_date: Optional[str],
-        days_requested: Optional[int]
+        days_requested: Optional[int],
+        start: Union[date, ValueError, None] = None
     ) -> Dict[str, Any]:
         """
         Perform all eligibility checks
         
+        Args:
+            employee: Employee data
+            leave_type: Leave type being checked
+            policy: Policy details for the leave type
+            start_date: Requested start date string
+            days_requested: Number of days requested
+            start: start_date already parsed by _parse_start_date
+        
         Returns:
-            Dictionary with check results
+            Dictionary with check results, summary and failed-check reasons
         """
         checks = []
         
+        if start_date and start is None:
+            start = _parse_start_date(start_date)
+        
+        # One policy.get per requirement; each check runs only when the
+        # policy defines it and the request has the inputs it needs
+        
         # 1. Tenure check (for leaves that require minimum tenure)
-        if "eligibility_months" in policy:
-            tenure_check = self._check_tenure(
+        if (required_months := policy.get("eligibility_months")) is not None:
+            checks.append(self._check_tenure(
                 employee["tenure_months"],
-                policy["eligibility_months"],
+                required_months,
                 leave_type
-            )
-            checks.append(tenure_check)
+            ))
         
         # 2. Leave balance check
-        if days_requested and "annual_allowance" in policy:
-            balance_check = self._check_balance(
+        if days_requested and policy.get("annual_allowance") is not None:
+            checks.append(self._check_balance(
                 employee["leave_balance"].get(leave_type, 0),
                 days_requested,
                 leave_type
-            )
-            checks.append(balance_check)
+            ))
         
         # 3. Notice period check
-        if start_date and "min_notice_days" in policy:
-            notice_check = self._check_notice_period(
+        if start_date and (min_notice_days := policy.get("min_notice_days")) is not None:
+            checks.append(self._check_notice_period(
                 start_date,
-                policy["min_notice_days"],
+                start,
+                min_notice_days,
                 leave_type
-            )
-            checks.append(notice_check)
+            ))
         
         # 4. Consecutive days check
-        if days_requested and "max_consecutive_days" in policy:
-            consecutive_check = self._check_consecutive_days(
+        if days_requested and (max_consecutive := policy.get("max_consecutive_days")) is not None:
+            checks.append(self._check_consecutive_days(
                 days_requested,
-                policy["max_consecutive_days"],
+                max_consecutive,
                 leave_type
-            )
-            checks.append(consecutive_check)
+            ))
         
         # 5. Blackout period check
-        if start_date and "blackout_periods" in policy:
-            blackout_check = self._check_blackout_period(
+        if start_date and (blackout_periods := policy.get("blackout_periods")) is not None:
+            checks.append(self._check_blackout_period(
                 start_date,
-                policy["blackout_periods"],
+                start,
+                blackout_periods,
                 leave_type
-            )
-            checks.append(blackout_check)
+            ))
         
-        # Generate summary
-        passed_count = sum(1 for check in checks if check["passed"])
+        # Single pass for the summary and the reasons of failed checks
+        reasons = [check["reason"] for check in checks if not check["passed"]]
         total_count = len(checks)
         
         summary = {
             "total_checks": total_count,
-            "passed_checks": passed_count,
-            "failed_checks": total_count - passed_count
+            "passed_checks": total_count - len(reasons),
+            "failed_checks": len(reasons)
         }
         
         return {
             "checks": checks,
-            "summary": summary
+            "summary": summary,
+            "reasons": reasons
         }
     
     def _check_tenure(
@@ -266,40 +352,39 @@ class EligibilityTool:
     def _check_notice_period(
         self,
         start_date: str,
+        start: Union[date, ValueError],
         min_notice_days: int,
         leave_type: str
     ) -> Dict[str, Any]:
         """Check if notice period requirement is met"""
-        try:
-            start = datetime.strptime(start_date, "%Y-%m-%d")
-            today = datetime.now()
-            days_notice = (start - today).days
-            
-            passed = days_notice >= min_notice_days
-            
-            return {
-                "check_name": "Notice Period",
-                "passed": passed,
-                "reason": (
-                    f"Notice period met: {days_notice} days notice "
-                    f"(required: {min_notice_days} days for {leave_type})"
-                    if passed else
-                    f"Insufficient notice: {days_notice} days "
-                    f"(need {min_notice_days} days for {leave_type})"
-                ),
-                "details": {
-                    "days_notice_given": days_notice,
-                    "required_notice_days": min_notice_days,
-                    "start_date": start_date
-                }
-            }
-        except ValueError as e:
+        if isinstance(start, ValueError):
             return {
                 "check_name": "Notice Period",
                 "passed": False,
                 "reason": f"Invalid start date format: {start_date}. Use YYYY-MM-DD",
-                "details": {"error": str(e)}
+                "details": {"error": str(start)}
+            }
+        
+        days_notice = (start - date.today()).days
+        
+        passed = days_notice >= min_notice_days
+        
+        return {
+            "check_name": "Notice Period",
+            "passed": passed,
+            "reason": (
+                f"Notice period met: {days_notice} days notice "
+                f"(required: {min_notice_days} days for {leave_type})"
+                if passed else
+                f"Insufficient notice: {days_notice} days "
+                f"(need {min_notice_days} days for {leave_type})"
+            ),
+            "details": {
+                "days_notice_given": days_notice,
+                "required_notice_days": min_notice_days,
+                "start_date": start_date
             }
+        }
     
     def _check_consecutive_days(
         self,
@@ -329,50 +414,51 @@ class EligibilityTool:
     def _check_blackout_period(
         self,
         start_date: str,
+        start: Union[date, ValueError],
         blackout_periods: list,
         leave_type: str
     ) -> Dict[str, Any]:
         """Check if request falls in blackout period"""
-        try:
-            start = datetime.strptime(start_date, "%Y-%m-%d")
-            
-            # Simple check - just check if month/day falls in blackout
-            # In production, you'd parse the blackout periods properly
-            for period in blackout_periods:
-                if "Dec" in period and start.month == 12:
-                    return {
-                        "check_name": "Blackout Period",
-                        "passed": False,
-                        "reason": (
-                            f"Leave request falls in blackout period: {period}. "
-                            f"{leave_type} cannot be taken during this time."
-                        ),
-                        "details": {
-                            "start_date": start_date,
-                            "blackout_period": period
-                        }
-                    }
-            
-            return {
-                "check_name": "Blackout Period",
-                "passed": True,
-                "reason": f"Leave request does not fall in any blackout period",
-                "details": {
-                    "start_date": start_date,
-                    "blackout_periods": blackout_periods
-                }
-            }
-            
-        except ValueError as e:
+        if isinstance(start, ValueError):
             return {
                 "check_name": "Blackout Period",
                 "passed": False,
                 "reason": f"Invalid start date format: {start_date}",
-                "details": {"error": str(e)}
+                "details": {"error": str(start)}
             }
+        
+        # Month-level check; each period's month is parsed once and cached
+        for period in blackout_periods:
+            if _blackout_month(period) == start.month:
+                return {
+                    "check_name": "Blackout Period",
+                    "passed": False,
+                    "reason": (
+                        f"Leave request falls in blackout period: {period}. "
+                        f"{leave_type} cannot be taken during this time."
+                    ),
+                    "details": {
+                        "start_date": start_date,
+                        "blackout_period": period
+                    }
+                }
+        
+        return {
+            "check_name": "Blackout Period",
+            "passed": True,
+            "reason": f"Leave request does not fall in any blackout period",
+            "details": {
+                "start_date": start_date,
+                "blackout_periods": blackout_periods
+            }
+        }
     
     def get_schema(self) -> Dict[str, Any]:
-        """Get JSON schema for the tool"""
+        """Get JSON schema for the tool (built once, shared; don't mutate)"""
+        return self._schema
+    
+    def _build_schema(self) -> Dict[str, Any]:
+        """Build the JSON schema for the tool"""
         return {
             "name": self.name,
             "description": self.description,
@@ -404,5 +490,7 @@ class EligibilityTool:
         }
 
 
-# Create singleton instance
-eligibility_tool = EligibilityTool()
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_eligibility_tool() -> EligibilityTool:
+    """Get the shared EligibilityTool, created on first use"""
+    return EligibilityTool()
@@ -3,7 +3,11 @@ Leave Policy Tool - Retrieves leave policy information
 """
 
 import logging
-from typing import Optional, Dict, Any
+import sys
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional, Dict, Any, Tuple
 
 from config.leave_policies import (
     get_leave_policy,
@@ -14,6 +18,76 @@ from config.leave_policies import (
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of memoized non-canonical lookups per tool
+LOOKUP_CACHE_SIZE = 128
+
+# Shortest partial leave type matched as a prefix, unless it is a whole word
+MIN_LEAVE_TYPE_PREFIX = 3
+
+# Trie node keys besides single characters: the leave type a node
+# completes, and the only leave type below it (None if several)
+_TRIE_END = "_end_"
+_TRIE_ONLY = "_only_"
+
+
+def _build_leave_type_trie(leave_types: Tuple[str, ...]) -> Dict[str, Any]:
+    """
+    Build a dict-of-dicts trie over casefolded leave type names
+    
+    Args:
+        leave_types: Canonical leave type names for one country
+        
+    Returns:
+        Root trie node
+    """
+    root: Dict[str, Any] = {}
+    
+    for name in leave_types:
+        node = root
+        for char in name.casefold():
+            node = node.setdefault(char, {})
+            if _TRIE_ONLY not in node:
+                node[_TRIE_ONLY] = name
+            elif node[_TRIE_ONLY] != name:
+                node[_TRIE_ONLY] = None
+        node[_TRIE_END] = name
+    
+    return root
+
+
+def _match_leave_type(trie: Dict[str, Any], query: str) -> Optional[str]:
+    """
+    Resolve a partial leave type in O(len(query))
+    
+    Matches a unique prefix ("sick" -> "Sick Leave") or a leave type
+    followed by extra words ("PTO days" -> "PTO"), ignoring case and
+    repeated whitespace. Prefixes shorter than MIN_LEAVE_TYPE_PREFIX only
+    match when they end on a word boundary, so "s" matches nothing.
+    
+    Args:
+        trie: Root node from _build_leave_type_trie
+        query: Leave type as given by the caller
+        
+    Returns:
+        Canonical leave type name, or None if nothing matches uniquely
+    """
+    query = " ".join(query.casefold().split())
+    node = trie
+    word_match = None
+    
+    for char in query:
+        if char == " " and _TRIE_END in node:
+            word_match = node[_TRIE_END]
+        node = node.get(char)
+        if node is None:
+            return word_match
+    
+    if _TRIE_END in node:
+        return node[_TRIE_END]
+    if len(query) >= MIN_LEAVE_TYPE_PREFIX or " " in node:
+        return node.get(_TRIE_ONLY) or word_match
+    return word_match
+
 
 class LeavePolicyTool:
     """
@@ -49,8 +123,54 @@ class LeavePolicyTool:
     def __init__(self):
         """Initialize the leave policy tool"""
         self.supported_countries = list_countries()
+        # Hashed, case-insensitive membership for the uppercased input
+        self.supported_countries_set = frozenset(
+            country.upper() for country in self.supported_countries
+        )
+        # Clean spellings (canonical or uppercased) -> interned uppercased
+        # code, so the common inputs skip upper()/strip() allocations
+        self._country_canonical: Dict[str, str] = {}
+        for country in self.supported_countries:
+            code = sys.intern(country.upper())
+            self._country_canonical[country] = code
+            self._country_canonical[code] = code
+        
+        # Static for the process lifetime; built once instead of per call
+        self._countries_joined = ", ".join(self.supported_countries)
+        # Keyed by the uppercased country that __call__ normalizes to
+        self._leave_types_by_country: Dict[str, Tuple[str, ...]] = {
+            country.upper(): list_leave_types(country)
+            for country in self.supported_countries
+        }
+        self._leave_type_tries: Dict[str, Dict[str, Any]] = {
+            country: _build_leave_type_trie(leave_types)
+            for country, leave_types in self._leave_types_by_country.items()
+        }
+        self._schema = self._build_schema()
+        
+        # Success responses for every canonical (country, leave type) pair,
+        # so the common lookups are a plain dict hit
+        self._responses: Dict[Tuple[str, Optional[str]], Dict[str, Any]] = {}
+        for country in self.supported_countries:
+            key = self._country_canonical[country]
+            self._responses[(key, None)] = self._success_response(
+                key, None, get_leave_policy(country)
+            )
+            for leave_type in list_leave_types(country):
+                self._responses[(key, leave_type)] = self._success_response(
+                    key, leave_type, get_leave_policy(country, leave_type)
+                )
+        
+        # LRU of the other normalized lookups (misspellings, prefixes, errors)
+        self._lookup_cache: "OrderedDict[Tuple[str, Optional[str]], Dict[str, Any]]" = (
+            OrderedDict()
+        )
+        # The tool is shared by agents running in different threads
+        self._lookup_cache_lock = threading.Lock()
+        
         logger.info(
-            f"LeavePolicyTool initialized with countries: {self.supported_countries}"
+            "LeavePolicyTool initialized with countries: %s",
+            self.supported_countries
         )
     
     def __call__(
@@ -66,20 +186,60 @@ class LeavePolicyTool:
             leave_type: Specific leave type (optional)
             
         Returns:
-            Dictionary with policy details or error message
+            Dictionary with policy details or error message. The dict is
+            cached and shared by identical lookups, so don't mutate it.
         """
         logger.info(
-            f"Looking up leave policy: country={country}, leave_type={leave_type}"
+            "Looking up leave policy: country=%s, leave_type=%s",
+            country, leave_type
         )
         
-        # Normalize country input
-        country = country.upper().strip()
+        # Normalize inputs so equivalent requests share one cache entry
+        normalized = self._country_canonical.get(country)
+        country = normalized if normalized is not None else country.upper().strip()
+        if leave_type is not None:
+            leave_type = leave_type.strip()
+        
+        key = (country, leave_type)
+        response = self._responses.get(key)
+        if response is not None:
+            return response
         
+        with self._lookup_cache_lock:
+            response = self._lookup_cache.get(key)
+            if response is not None:
+                self._lookup_cache.move_to_end(key)
+                return response
+        
+        response = self._lookup(country, leave_type)
+        with self._lookup_cache_lock:
+            self._lookup_cache[key] = response
+            if len(self._lookup_cache) > LOOKUP_CACHE_SIZE:
+                self._lookup_cache.popitem(last=False)
+        return response
+    
+    def _lookup(
+        self,
+        country: str,
+        leave_type: Optional[str]
+    ) -> Dict[str, Any]:
+        """
+        Build the response for normalized inputs
+        
+        The policy table is static, so __call__ memoizes the result.
+        
+        Args:
+            country: Uppercased, stripped country code
+            leave_type: Stripped leave type, or None for all types
+            
+        Returns:
+            Dictionary with policy details or error message
+        """
         # Validate country
-        if country not in self.supported_countries:
+        if country not in self.supported_countries_set:
             error_msg = (
                 f"Country '{country}' not supported. "
-                f"Supported countries are: {', '.join(self.supported_countries)}"
+                f"Supported countries are: {self._countries_joined}"
             )
             logger.warning(error_msg)
             return {
@@ -91,10 +251,24 @@ class LeavePolicyTool:
         # Get policy
         policy = get_leave_policy(country, leave_type)
         
+        if policy is None and leave_type:
+            # Tolerate prefixes and trailing words rather than failing and
+            # making the agent retry with the exact name
+            matched = _match_leave_type(self._leave_type_tries[country], leave_type)
+            if matched is not None:
+                logger.info(
+                    "Matched leave type %r to %s for %s", leave_type, matched, country
+                )
+                response = self._success_response(
+                    country, matched, get_leave_policy(country, matched)
+                )
+                response["matched_via"] = "prefix"
+                return response
+        
         if policy is None:
             # Check if it's because leave_type is invalid
             if leave_type:
-                available_types = list_leave_types(country)
+                available_types = self._leave_types_by_country[country]
                 error_msg = (
                     f"Leave type '{leave_type}' not found for {country}. "
                     f"Available types: {', '.join(available_types)}"
@@ -114,7 +288,16 @@ class LeavePolicyTool:
                     "error": error_msg
                 }
         
-        # Format successful response
+        logger.info("Successfully retrieved policy for %s", country)
+        return self._success_response(country, leave_type, policy)
+    
+    def _success_response(
+        self,
+        country: str,
+        leave_type: Optional[str],
+        policy: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Format a successful lookup response"""
         response = {
             "success": True,
             "country": country,
@@ -124,16 +307,20 @@ class LeavePolicyTool:
         if leave_type:
             response["leave_type"] = leave_type
         else:
-            response["available_leave_types"] = list(policy.keys())
+            # Shared precomputed tuple (serializes as a JSON array)
+            response["available_leave_types"] = self._leave_types_by_country[country]
         
-        logger.info(f"Successfully retrieved policy for {country}")
         return response
     
     def get_schema(self) -> Dict[str, Any]:
         """
         Get JSON schema for the tool
-        Used by ADK for function calling
+        Used by ADK for function calling (built once, shared; don't mutate)
         """
+        return self._schema
+    
+    def _build_schema(self) -> Dict[str, Any]:
+        """Build the JSON schema for the tool"""
         return {
             "name": self.name,
             "description": self.description,
@@ -143,7 +330,7 @@ class LeavePolicyTool:
                     "country": {
                         "type": "string",
                         "description": "Country code (US, India, UK)",
-                        "enum": self.supported_countries
+                        "enum": list(self.supported_countries)
                     },
                     "leave_type": {
                         "type": "string",
@@ -159,6 +346,24 @@ class LeavePolicyTool:
         }
 
 
+def _format_bool(value: bool) -> str:
+    return "Yes" if value else "No"
+
+
+def _format_list(value: list) -> str:
+    return ", ".join(map(str, value))
+
+
+# Display formatter per exact value type; anything else uses str
+_VALUE_FORMATTERS = {bool: _format_bool, list: _format_list}
+
+
+@lru_cache(maxsize=32)
+def _display_key(key: str) -> str:
+    """Format a policy key nicely (policy keys are a small closed set)"""
+    return key.replace("_", " ").title()
+
+
 def format_policy_for_display(policy_data: Dict[str, Any]) -> str:
     """
     Format policy data for human-readable display
@@ -175,26 +380,16 @@ def format_policy_for_display(policy_data: Dict[str, Any]) -> str:
     country = policy_data["country"]
     policies = policy_data["policies"]
     
-    output = [f"Leave Policies for {country}:"]
-    output.append("=" * 50)
+    output = [f"Leave Policies for {country}:", "=" * 50]
     
     for leave_name, details in policies.items():
         output.append(f"\n{leave_name}:")
         output.append("-" * 30)
-        
-        for key, value in details.items():
-            # Format key nicely
-            display_key = key.replace("_", " ").title()
-            
-            # Format value
-            if isinstance(value, bool):
-                display_value = "Yes" if value else "No"
-            elif isinstance(value, list):
-                display_value = ", ".join(str(v) for v in value)
-            else:
-                display_value = str(value)
-            
-            output.append(f"  {display_key}: {display_value}")
+        output.extend(
+            f"  {_display_key(key)}: "
+            f"{_VALUE_FORMATTERS.get(type(value), str)(value)}"
+            for key, value in details.items()
+        )
     
     return "\n".join(output)
 
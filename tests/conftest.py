@@ -0,0 +1,25 @@
+"""
+Shared pytest fixtures
+"""
+
+import pytest
+from unittest.mock import MagicMock
+
+from src.tools.eligibility_tool import EligibilityTool
+
+
+@pytest.fixture(scope="module")
+def mock_snowflake_client():
+    """Snowflake client mock limited to the one method the tool calls"""
+    return MagicMock(spec=["get_employee_by_id"])
+
+
+@pytest.fixture(scope="module")
+def eligibility_tool_instance(mock_snowflake_client):
+    """EligibilityTool built once per module, wired to mock_snowflake_client"""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(
+            "src.tools.eligibility_tool.get_snowflake_client",
+            lambda: mock_snowflake_client
+        )
+        return EligibilityTool()
@@ -5,10 +5,11 @@ Test suite for Leave Policy Agent
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 import json
+import time
 
 from src.agents.leave_agent import LeaveAgent
 from src.tools.leave_policy_tool import leave_policy_tool
-from src.tools.eligibility_tool import eligibility_tool
+from src.tools.eligibility_tool import get_eligibility_tool
 from config.leave_policies import LEAVE_POLICIES, MOCK_EMPLOYEES
 
 
@@ -59,20 +60,11 @@ class TestLeavePolicyTool:
 class TestEligibilityTool:
     """Tests for eligibility tool"""
     
-    @patch('src.tools.eligibility_tool.get_snowflake_client')
-    def test_eligible_employee(self, mock_snowflake):
+    def test_eligible_employee(self, eligibility_tool_instance, mock_snowflake_client):
         """Test eligible employee"""
-        # Mock Snowflake client
-        mock_client = Mock()
-        mock_client.get_employee_by_id.return_value = MOCK_EMPLOYEES["EMP001"]
-        mock_snowflake.return_value = mock_client
+        mock_snowflake_client.get_employee_by_id.return_value = MOCK_EMPLOYEES["EMP001"]
         
-        # Create new eligibility tool instance with mocked client
-        from src.tools.eligibility_tool import EligibilityTool
-        tool = EligibilityTool()
-        tool.snowflake_client = mock_client
-        
-        result = tool(
+        result = eligibility_tool_instance(
             employee_id="EMP001",
             leave_type="PTO",
             days_requested=5
@@ -82,18 +74,11 @@ class TestEligibilityTool:
         assert result["eligible"] is True
         assert result["employee_id"] == "EMP001"
     
-    @patch('src.tools.eligibility_tool.get_snowflake_client')
-    def test_insufficient_balance(self, mock_snowflake):
+    def test_insufficient_balance(self, eligibility_tool_instance, mock_snowflake_client):
         """Test insufficient leave balance"""
-        mock_client = Mock()
-        mock_client.get_employee_by_id.return_value = MOCK_EMPLOYEES["EMP001"]
-        mock_snowflake.return_value = mock_client
-        
-        from src.tools.eligibility_tool import EligibilityTool
-        tool = EligibilityTool()
-        tool.snowflake_client = mock_client
+        mock_snowflake_client.get_employee_by_id.return_value = MOCK_EMPLOYEES["EMP001"]
         
-        result = tool(
+        result = eligibility_tool_instance(
             employee_id="EMP001",
             leave_type="PTO",
             days_requested=50  # More than balance
@@ -103,18 +88,11 @@ class TestEligibilityTool:
         assert result["eligible"] is False
         assert any("Insufficient" in r for r in result.get("reasons", []))
     
-    @patch('src.tools.eligibility_tool.get_snowflake_client')
-    def test_employee_not_found(self, mock_snowflake):
+    def test_employee_not_found(self, eligibility_tool_instance, mock_snowflake_client):
         """Test employee not found"""
-        mock_client = Mock()
-        mock_client.get_employee_by_id.return_value = None
-        mock_snowflake.return_value = mock_client
-        
-        from src.tools.eligibility_tool import EligibilityTool
-        tool = EligibilityTool()
-        tool.snowflake_client = mock_client
+        mock_snowflake_client.get_employee_by_id.return_value = None
         
-        result = tool(
+        result = eligibility_tool_instance(
             employee_id="INVALID",
             leave_type="PTO"
         )
@@ -123,23 +101,15 @@ class TestEligibilityTool:
         assert result["eligible"] is False
         assert "not found" in result["error"]
     
-    @patch('src.tools.eligibility_tool.get_snowflake_client')
-    def test_tenure_requirement(self, mock_snowflake):
+    def test_tenure_requirement(self, eligibility_tool_instance, mock_snowflake_client):
         """Test tenure requirement check"""
-        mock_client = Mock()
-        
         # Employee with insufficient tenure
         employee = MOCK_EMPLOYEES["EMP003"].copy()
         employee["tenure_months"] = 2  # Less than required 12 months
         
-        mock_client.get_employee_by_id.return_value = employee
-        mock_snowflake.return_value = mock_client
-        
-        from src.tools.eligibility_tool import EligibilityTool
-        tool = EligibilityTool()
-        tool.snowflake_client = mock_client
+        mock_snowflake_client.get_employee_by_id.return_value = employee
         
-        result = tool(
+        result = eligibility_tool_instance(
             employee_id="EMP003",
             leave_type="Parental Leave"
         )
@@ -154,7 +124,20 @@ class TestEligibilityTool:
 class TestCallbacks:
     """Tests for before/after model callbacks"""
     
-    def test_before_model_pii_detection(self):
+    @pytest.fixture(params=["re", "re2"])
+    def detect_engine(self, request, monkeypatch):
+        """Run pattern detection on each regex engine (RE2 only if installed)"""
+        from src.callbacks import after_model, before_model
+        
+        if request.param == "re2":
+            if not before_model.RE2_AVAILABLE:
+                pytest.skip("google-re2 is not installed")
+        else:
+            for module in (before_model, after_model):
+                monkeypatch.setattr(module, "_RE2_PATTERNS", None)
+        return request.param
+    
+    def test_before_model_pii_detection(self, detect_engine):
         """Test PII detection in before_model callback"""
         from src.callbacks.before_model import before_model_callback
         
@@ -170,7 +153,7 @@ class TestCallbacks:
         assert result["metadata"]["pii_detected"]["ssn"] is True
         assert result["metadata"]["pii_masked"] is True
     
-    def test_before_model_sql_injection(self):
+    def test_before_model_sql_injection(self, detect_engine):
         """Test SQL injection detection"""
         from src.callbacks.before_model import before_model_callback
         
@@ -186,7 +169,75 @@ class TestCallbacks:
         assert result["metadata"]["validation_passed"] is False
         assert any("injection" in issue.lower() for issue in result["metadata"]["issues"])
     
-    def test_after_model_pii_removal(self):
+    def test_before_model_detects_overlapping_patterns(self, detect_engine):
+        """Test PII inside a script tag is still detected"""
+        from src.callbacks.before_model import before_model_callback
+        
+        messages = [
+            {
+                "role": "user",
+                "content": "<script>send('123-45-6789')</script>"
+            }
+        ]
+        
+        result = before_model_callback(messages)
+        issues = result["metadata"]["issues"]
+        
+        assert result["metadata"]["pii_detected"]["ssn"] is True
+        assert "Potential script_injection detected" in issues
+        assert "Potential command_injection detected" in issues
+        assert "123-45-6789" not in result["messages"][0]["content"]
+    
+    @pytest.mark.parametrize("content,expected", [
+        ("Email delete.me@corp.com please", {"email", "sql_injection"}),
+        ("select@corp.com", {"email", "sql_injection"}),
+        ("reach me at 5551234567.jd@corp.com", {"email", "phone"}),
+        ("192.168.1.1@foo.com", {"email", "ip_address"}),
+    ])
+    def test_before_model_detects_co_starting_patterns(
+        self, detect_engine, content, expected
+    ):
+        """Test categories matching at the same position are all detected"""
+        from src.callbacks.before_model import _detect
+        
+        assert _detect(content) >= expected
+    
+    def test_before_model_case_folding_is_ascii(self, detect_engine):
+        """Test case folding only maps ASCII letters on either engine"""
+        from src.callbacks.before_model import _detect
+        
+        assert "sql_injection" in _detect("SeLeCt name")
+        # U+017F LATIN SMALL LETTER LONG S folds to 's' under Unicode rules
+        assert "sql_injection" not in _detect("\u017felect name")
+    
+    def test_before_model_latest_user_hint(self):
+        """Test the latest user message index hint and its fallback"""
+        from src.callbacks.before_model import BeforeModelCallback
+        
+        callback = BeforeModelCallback()
+        messages = [
+            {"role": "user", "content": "first"},
+            {"role": "assistant", "content": "reply"},
+            {"role": "user", "content": "second"},
+            {"role": "system", "content": "note"}
+        ]
+        
+        assert callback._get_latest_user_message(messages, 2)["content"] == "second"
+        assert callback._get_latest_user_message(messages, 3)["content"] == "second"
+        assert callback._get_latest_user_message(messages, 99)["content"] == "second"
+        assert callback._get_latest_user_message(messages[1:2]) is None
+    
+    def test_before_model_sanitization(self):
+        """Test dangerous characters are stripped and special chars counted"""
+        from src.callbacks.before_model import BeforeModelCallback
+        
+        callback = BeforeModelCallback()
+        
+        assert callback._sanitize_input("echo `id`; $HOME") == "echo id HOME"
+        assert callback._validate_input("a;b;")["special_char_ratio"] == 0.5
+        assert callback._validate_input("é;")["special_char_ratio"] == 0.5
+    
+    def test_after_model_pii_removal(self, detect_engine):
         """Test PII removal in after_model callback"""
         from src.callbacks.after_model import after_model_callback
         
@@ -197,23 +248,64 @@ class TestCallbacks:
         assert "123-45-6789" not in result["response"]
         assert "4532-1234-5678-9010" not in result["response"]
         assert result["metadata"]["pii_removed"] is True
+    
+    def test_after_model_detects_all_categories(self, detect_engine):
+        """Test every category in a response is detected, not only the first"""
+        from src.callbacks.after_model import _detect
+        
+        assert _detect("Damn, 123-45-6789 shows bias") == {
+            "profanity", "ssn", "discriminatory"
+        }
+        assert _detect("All clear.") == set()
+    
+    def test_before_model_masks_pii_in_one_pass(self):
+        """Test each PII type gets its own mask and email keeps its domain"""
+        from src.callbacks.before_model import BeforeModelCallback
+        
+        callback = BeforeModelCallback()
+        masked = callback._mask_pii(
+            "SSN 123-45-6789, card 4532 1234 5678 9010, "
+            "mail jane.doe@example.com, call 555-123-4567"
+        )
+        
+        assert masked == (
+            "SSN ***-**-****, card **** **** **** ****, "
+            "mail ***@example.com, call ***-***-****"
+        )
+    
+    def test_after_model_formatting(self):
+        """Test response formatting fixes spacing and whitespace"""
+        from src.callbacks.after_model import after_model_callback
+        
+        response = "  You get 20 days.Ask HR!Thanks.\n\n-  Item   one  "
+        
+        result = after_model_callback(response)
+        
+        assert result["response"].startswith(
+            "You get 20 days. Ask HR! Thanks. - Item one"
+        )
+    
+    def test_after_model_uncertainty_detection(self):
+        """Test hallucination markers are matched case-insensitively"""
+        from src.callbacks.after_model import AfterModelCallback
+        
+        callback = AfterModelCallback()
+        
+        assert callback._validate_response("i'm NOT sure about that.")["has_uncertainty"]
+        assert not callback._validate_response("You get 20 days.")["has_uncertainty"]
 
 
 class TestLeaveAgent:
     """Tests for the main Leave Agent"""
     
-    @patch('src.agents.leave_agent.completion')
-    def test_agent_initialization(self, mock_completion):
+    def test_agent_initialization(self, agent):
         """Test agent initialization"""
-        agent = LeaveAgent()
-        
         assert agent is not None
         assert len(agent.tools) == 2
         assert "get_leave_policy" in agent.tools
         assert "check_leave_eligibility" in agent.tools
     
-    @patch('src.agents.leave_agent.completion')
-    def test_simple_conversation(self, mock_completion):
+    def test_simple_conversation(self, agent, mock_completion):
         """Test simple conversation"""
         # Mock LLM response
         mock_response = Mock()
@@ -225,22 +317,106 @@ class TestLeaveAgent:
         ]
         mock_completion.return_value = mock_response
         
-        agent = LeaveAgent()
         response = agent.chat("How many PTO days do US employees get?")
         
         assert response is not None
         assert len(response) > 0
     
-    @patch('src.agents.leave_agent.completion')
-    def test_conversation_history(self, mock_completion):
-        """Test conversation history tracking"""
+    def test_tool_call_flow(self, agent, mock_completion):
+        """Test tool calls are executed and results sent back to the LLM"""
+        tool_call = Mock(id="call_1")
+        tool_call.function.name = "get_leave_policy"
+        tool_call.function.arguments = json.dumps(
+            {"country": "US", "leave_type": "PTO"}
+        )
+        
+        tool_response = Mock()
+        tool_response.choices = [
+            Mock(message=Mock(content=None, tool_calls=[tool_call]))
+        ]
+        final_response = Mock()
+        final_response.choices = [
+            Mock(message=Mock(
+                content="US employees get 20 PTO days per year.",
+                tool_calls=None
+            ))
+        ]
+        mock_completion.side_effect = [tool_response, final_response]
+        
+        response = agent.chat("How many PTO days do US employees get?")
+        
+        assert "20 PTO days" in response
+        
+        # Second LLM call should include the tool result
+        messages = mock_completion.call_args_list[1].kwargs["messages"]
+        tool_messages = [m for m in messages if m["role"] == "tool"]
+        assert len(tool_messages) == 1
+        assert tool_messages[0]["tool_call_id"] == "call_1"
+        result = json.loads(tool_messages[0]["content"])
+        assert result["success"] is True
+        assert result["policies"]["PTO"]["annual_allowance"] == 20
+        
+    def test_user_context_prompt_cached(self, agent, mock_completion):
+        """Test repeated user context is serialized once and reused"""
         mock_response = Mock()
         mock_response.choices = [
             Mock(message=Mock(content="Test response", tool_calls=None))
         ]
         mock_completion.return_value = mock_response
         
-        agent = LeaveAgent()
+        agent.chat("First", user_context={"employee_id": "EMP001", "country": "US"})
+        agent.chat("Second", user_context={"country": "US", "employee_id": "EMP001"})
+        
+        assert len(agent._ctx_cache) == 1
+        base_message, context_message = mock_completion.call_args.kwargs["messages"][:2]
+        assert base_message["content"] == LeaveAgent.SYSTEM_INSTRUCTIONS
+        assert context_message["role"] == "system"
+        assert "EMP001" in context_message["content"]
+    
+    def test_user_context_cache_distinguishes_types(self, agent):
+        """Test equal-hashing values of different types get their own message"""
+        messages = [
+            agent._get_context_message({"is_manager": value})["content"]
+            for value in (True, 1, 1.0)
+        ]
+        
+        assert len(agent._ctx_cache) == 3
+        assert "true" in messages[0]
+        assert "true" not in messages[1]
+        assert "1.0" in messages[2]
+    
+    def test_identical_conversation_uses_cache(self, agent, mock_completion):
+        """Test identical conversations reuse the cached LLM response"""
+        mock_response = Mock()
+        mock_response.choices = [
+            Mock(message=Mock(content="Test response.", tool_calls=None))
+        ]
+        mock_completion.return_value = mock_response
+        
+        first = agent.chat("How many PTO days do US employees get?")
+        agent.reset_conversation()
+        second = agent.chat("How many PTO days do US employees get?")
+        
+        assert first == second
+        assert mock_completion.call_count == 1
+    
+    def test_errors_not_cached(self, agent, mock_completion):
+        """Test LLM errors are not cached"""
+        mock_completion.side_effect = Exception("LLM down")
+        
+        agent.chat("Hello")
+        agent.reset_conversation()
+        agent.chat("Hello")
+        
+        assert mock_completion.call_count == 2
+    
+    def test_conversation_history(self, agent, mock_completion):
+        """Test conversation history tracking"""
+        mock_response = Mock()
+        mock_response.choices = [
+            Mock(message=Mock(content="Test response", tool_calls=None))
+        ]
+        mock_completion.return_value = mock_response
         
         agent.chat("First message")
         agent.chat("Second message")
@@ -250,9 +426,13 @@ class TestLeaveAgent:
         assert len(history) == 4  # 2 user + 2 assistant messages
         assert history[0]["role"] == "user"
         assert history[1]["role"] == "assistant"
+        
+        # Mutating the returned copy must not affect the agent
+        history[0]["content"] = "changed"
+        assert agent.get_conversation_history()[0]["content"] == "First message"
+        assert list(agent.iter_history())[0] == ("user", "First message")
     
-    @patch('src.agents.leave_agent.completion')
-    def test_reset_conversation(self, mock_completion):
+    def test_reset_conversation(self, agent, mock_completion):
         """Test conversation reset"""
         mock_response = Mock()
         mock_response.choices = [
@@ -260,8 +440,6 @@ class TestLeaveAgent:
         ]
         mock_completion.return_value = mock_response
         
-        agent = LeaveAgent()
-        
         agent.chat("Message")
         assert len(agent.get_conversation_history()) > 0
         
@@ -304,6 +482,74 @@ class TestCircuitBreaker:
         # Circuit should be open now
         with pytest.raises(CircuitBreakerError):
             cb.call(failing_func)
+    
+    def test_circuit_breaker_half_open_after_timeout(self):
+        """Test circuit breaker allows a trial call once the timeout passes"""
+        from src.integrations.circuit_breaker import CircuitBreaker, CircuitState
+        
+        cb = CircuitBreaker(failure_threshold=1, timeout=0, success_threshold=1)
+        
+        def failing_func():
+            raise Exception("Service down")
+        
+        with pytest.raises(Exception):
+            cb.call(failing_func)
+        
+        assert cb.state == CircuitState.HALF_OPEN
+        assert cb.call(lambda: "recovered") == "recovered"
+        assert cb.state == CircuitState.CLOSED
+        assert cb.get_stats()["last_failure_time"] <= time.time()
+    
+    def test_circuit_breaker_decorator(self):
+        """Test decorator wraps the function and exposes its breaker"""
+        from src.integrations.circuit_breaker import circuit_breaker, CircuitBreakerError
+        
+        @circuit_breaker(failure_threshold=1, timeout=10, name="decorated")
+        def flaky(value):
+            """Flaky service"""
+            raise ValueError(value)
+        
+        assert flaky.__name__ == "flaky"
+        assert flaky.__doc__ == "Flaky service"
+        
+        with pytest.raises(ValueError):
+            flaky("down")
+        with pytest.raises(CircuitBreakerError):
+            flaky("down")
+        assert flaky.circuit_breaker.get_stats()["failure_count"] == 1
+    
+    def test_decorated_circuit_breaker_registered(self):
+        """Test decorator breakers are visible in the global registry"""
+        from src.integrations.circuit_breaker import (
+            circuit_breaker,
+            get_circuit_breaker,
+            get_all_circuit_breaker_stats
+        )
+        
+        @circuit_breaker(name="registered_service")
+        def service():
+            return "ok"
+        
+        assert get_circuit_breaker("registered_service") is service.circuit_breaker
+        names = [stats["name"] for stats in get_all_circuit_breaker_stats()]
+        assert "registered_service" in names
+    
+    def test_unnamed_decorated_circuit_breakers_kept_apart(self):
+        """Test unnamed decorator breakers register under their function names"""
+        from src.integrations.circuit_breaker import circuit_breaker, get_circuit_breaker
+        
+        @circuit_breaker()
+        def first():
+            return 1
+        
+        @circuit_breaker()
+        def second():
+            return 2
+        
+        assert first.circuit_breaker is not second.circuit_breaker
+        assert get_circuit_breaker(first.circuit_breaker.name) is first.circuit_breaker
+        assert get_circuit_breaker(second.circuit_breaker.name) is second.circuit_breaker
+        assert second.circuit_breaker.name.endswith("<locals>.second")
 
 
 class TestSnowflakeClient:
@@ -341,14 +587,226 @@ class TestSnowflakeClient:
         
         assert len(us_employees) > 0
         assert all(emp["country"] == "US" for emp in us_employees)
+    
+    def test_mock_mode_has_no_circuit_breaker(self):
+        """Test mock mode skips creating and registering a circuit breaker"""
+        from src.integrations.snowflake_client import SnowflakeClient
+        
+        client = SnowflakeClient(use_mock=True)
+        
+        assert client.circuit_breaker is None
+        assert client.get_stats()["circuit_breaker"] is None
+    
+    def test_query_errors_exclude_unrelated_exceptions(self):
+        """Test the expected-failure tuple never degrades into a catch-all"""
+        from src.integrations.snowflake_client import SNOWFLAKE_QUERY_ERRORS
+        
+        assert Exception not in SNOWFLAKE_QUERY_ERRORS
+        assert not issubclass(ValueError, SNOWFLAKE_QUERY_ERRORS)
+        assert not issubclass(KeyError, SNOWFLAKE_QUERY_ERRORS)
+    
+    def test_close_snowflake_client(self):
+        """Test closing the global client closes its session and resets it"""
+        from src.integrations import snowflake_client as module
+        
+        client = module.get_snowflake_client()
+        session = Mock()
+        client.session = session
+        
+        module.close_snowflake_client()
+        
+        session.close.assert_called_once()
+        assert client.session is None
+        assert module.get_snowflake_client() is not client
+        
+        # Closing again with no client is a no-op
+        module.close_snowflake_client()
+        module.close_snowflake_client()
+    
+    def test_real_queries_cached(self):
+        """Test repeated real-mode lookups are served from the cache"""
+        from src.integrations.snowflake_client import SnowflakeClient
+        from src.integrations.circuit_breaker import CircuitBreaker
+        
+        client = SnowflakeClient(use_mock=True)
+        client.use_mock = False
+        client.circuit_breaker = CircuitBreaker(name="test_snowflake")
+        record = {"employee_id": "EMP900", "country": "US"}
+        client._query_employee_real = Mock(return_value=record)
+        
+        first = client.get_employee_by_id("EMP900")
+        first["country"] = "India"
+        second = client.get_employee_by_id("EMP900")
+        
+        assert second == record
+        assert client._query_employee_real.call_count == 1
+        assert client.get_stats()["cache"]["hits"] == 1
+        
+        client.invalidate_employee("EMP900")
+        client.get_employee_by_id("EMP900")
+        assert client._query_employee_real.call_count == 2
+    
+    def test_leave_balance_isolated_from_cache(self):
+        """Test nested leave balances are copied in mock mode and on cache hits"""
+        from src.integrations.snowflake_client import SnowflakeClient
+        from src.integrations.circuit_breaker import CircuitBreaker
+        
+        mock_client = SnowflakeClient(use_mock=True)
+        mock_client.get_employee_by_id("EMP001")["leave_balance"]["PTO"] = 0
+        mock_client.get_employees_by_ids(["EMP001"])["EMP001"]["leave_balance"]["PTO"] = 0
+        mock_client.query_employees_by_country("US")[0]["leave_balance"]["PTO"] = 0
+        
+        assert mock_client.get_employee_by_id("EMP001")["leave_balance"]["PTO"] == 15
+        assert MOCK_EMPLOYEES["EMP001"]["leave_balance"]["PTO"] == 15
+        
+        client = SnowflakeClient(use_mock=True)
+        client.use_mock = False
+        client.circuit_breaker = CircuitBreaker(name="test_snowflake")
+        record = {"employee_id": "EMP900", "leave_balance": {"PTO": 10}}
+        client._query_employee_real = Mock(return_value=record)
+        
+        client.get_employee_by_id("EMP900")["leave_balance"]["PTO"] = 0
+        client.get_employee_by_id("EMP900")["leave_balance"]["PTO"] = 0
+        client.get_employees_by_ids(["EMP900"])["EMP900"]["leave_balance"]["PTO"] = 0
+        
+        assert client.get_employee_by_id("EMP900")["leave_balance"]["PTO"] == 10
+        assert record["leave_balance"]["PTO"] == 10
+        assert client._query_employee_real.call_count == 1
+    
+    def test_get_employees_by_ids(self):
+        """Test batched lookup de-duplicates IDs and skips unknown ones"""
+        from src.integrations.snowflake_client import SnowflakeClient
+        
+        client = SnowflakeClient(use_mock=True)
+        
+        employees = client.get_employees_by_ids(["EMP001", "INVALID", "EMP001"])
+        
+        assert list(employees) == ["EMP001"]
+        assert employees["EMP001"]["country"] == "US"
+    
+    def test_get_employees_by_ids_single_round_trip(self):
+        """Test batched real lookup queries only uncached IDs, once"""
+        from src.integrations.snowflake_client import SnowflakeClient
+        from src.integrations.circuit_breaker import CircuitBreaker
+        
+        client = SnowflakeClient(use_mock=True)
+        client.use_mock = False
+        client.circuit_breaker = CircuitBreaker(name="test_snowflake")
+        client._query_employees_by_ids_real = Mock(return_value={
+            "EMP900": {"employee_id": "EMP900"},
+            "EMP901": {"employee_id": "EMP901"}
+        })
+        
+        employees = client.get_employees_by_ids(["EMP900", "EMP901", "EMP900"])
+        assert set(employees) == {"EMP900", "EMP901"}
+        client._query_employees_by_ids_real.assert_called_once_with(["EMP900", "EMP901"])
+        
+        # Fetched rows now serve single and batched lookups from the cache
+        client._query_employee_real = Mock()
+        assert client.get_employee_by_id("EMP901") == {"employee_id": "EMP901"}
+        client.get_employees_by_ids(["EMP900"])
+        client._query_employee_real.assert_not_called()
+        assert client._query_employees_by_ids_real.call_count == 1
+    
+    def test_real_query_uses_bind_parameters(self):
+        """Test employee IDs are bound, not interpolated into the SQL"""
+        from src.integrations.snowflake_client import SnowflakeClient
+        from snowflake.snowpark import Row
+        
+        client = SnowflakeClient(use_mock=True)
+        session = Mock()
+        session.sql.return_value.collect.return_value = [Row(
+            EMPLOYEE_ID="EMP900", NAME="Test", COUNTRY="US",
+            DEPARTMENT="Eng", JOIN_DATE="2020-01-01",
+            TENURE_MONTHS=12, LEAVE_BALANCE={}
+        )]
+        client._get_session = Mock(return_value=session)
+        
+        employee = client._query_employee_real("x' OR '1'='1")
+        
+        query, = session.sql.call_args.args
+        assert "x' OR" not in query
+        assert session.sql.call_args.kwargs["params"] == ["x' OR '1'='1"]
+        assert employee["employee_id"] == "EMP900"
+        assert employee["tenure_months"] == 12
+    
+    def test_country_query_streams_rows(self):
+        """Test country query converts rows straight from the iterator"""
+        from src.integrations.snowflake_client import SnowflakeClient
+        from snowflake.snowpark import Row
+        
+        client = SnowflakeClient(use_mock=True)
+        session = Mock()
+        session.sql.return_value.to_local_iterator.return_value = iter([Row(
+            EMPLOYEE_ID="EMP900", NAME="Test", COUNTRY="US",
+            DEPARTMENT="Eng", JOIN_DATE="2020-01-01",
+            TENURE_MONTHS=12, LEAVE_BALANCE={}
+        )])
+        client._get_session = Mock(return_value=session)
+        
+        employees = client._query_employees_by_country_real("US")
+        
+        assert [emp["employee_id"] for emp in employees] == ["EMP900"]
+        assert session.sql.call_args.kwargs["params"] == ["US"]
+        session.sql.return_value.collect.assert_not_called()
+    
+    def test_fallback_to_mock_flag(self):
+        """Test query errors fall back to mock data only when enabled"""
+        from src.integrations.snowflake_client import SnowflakeClient
+        from src.integrations.circuit_breaker import CircuitBreaker, CircuitBreakerError
+        
+        client = SnowflakeClient(use_mock=True, fallback_to_mock=True)
+        client.use_mock = False
+        client.circuit_breaker = CircuitBreaker(name="test_snowflake")
+        client._query_employee_real = Mock(side_effect=CircuitBreakerError("open"))
+        
+        assert client.get_employee_by_id("EMP001")["country"] == "US"
+        
+        client._fallback_to_mock = False
+        with pytest.raises(CircuitBreakerError):
+            client.get_employee_by_id("EMP001")
+        
+        # Unexpected errors are never masked by mock data
+        client._fallback_to_mock = True
+        client._query_employee_real = Mock(side_effect=KeyError("bug"))
+        with pytest.raises(KeyError):
+            client.get_employee_by_id("EMP001")
+    
+    @patch('src.integrations.snowflake_client.Session')
+    def test_stale_session_reconnects(self, mock_session_cls):
+        """Test the pinned session is reused and rebuilt only when dead"""
+        from src.integrations import snowflake_client
+        
+        client = snowflake_client.SnowflakeClient(use_mock=True)
+        client._connection_params = {"account": "test"}
+        create = mock_session_cls.builder.configs.return_value.create
+        
+        session = client._get_session()
+        assert client._get_session() is session
+        assert create.call_count == 1
+        
+        # Past the health interval a failing SELECT 1 triggers a reconnect
+        session.sql.side_effect = Exception("session expired")
+        client._last_health_check -= snowflake_client.SESSION_HEALTH_INTERVAL
+        create.return_value = Mock()
+        
+        assert client._get_session() is create.return_value
+        assert create.call_count == 2
+        session.close.assert_called_once()
 
 
 # Pytest configuration
 @pytest.fixture
-def agent():
-    """Fixture for agent instance"""
-    with patch('src.agents.leave_agent.completion'):
-        return LeaveAgent()
+def mock_completion():
+    """Fixture for the patched LLM completion call"""
+    with patch('src.agents.leave_agent.completion') as mock:
+        yield mock
+
+
+@pytest.fixture
+def agent(mock_completion):
+    """Fixture for agent instance (per test: it holds conversation state)"""
+    return LeaveAgent()
 
 
 @pytest.fixture
@@ -359,7 +817,3 @@ def mock_llm_response():
         Mock(message=Mock(content="Test response", tool_calls=None))
     ]
     return mock_response
-
-
-if __name__ == "__main__":
-    pytest.main([__file__, "-v", "--cov=src", "--cov-report=html"])
\ No newline at end of file
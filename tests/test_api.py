@@ -6,20 +6,28 @@ import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import patch, Mock
 import json
+import time
 
 from src.api.main import app
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def client():
-    """Test client fixture"""
+    """
+    Test client fixture, shared by every test
+    
+    Used without a `with` block, so the app lifespan never runs; tests patch
+    the module-level agent and Snowflake client they need instead.
+    """
     return TestClient(app)
 
 
 @pytest.fixture
 def mock_agent():
-    """Mock agent fixture"""
-    with patch('src.api.main.agent') as mock:
+    """Mock agent fixture, also used for every per-session agent"""
+    with patch('src.api.main.agent') as mock, \
+            patch('src.api.main.LeaveAgent', return_value=mock), \
+            patch.dict('src.api.main._session_agents', clear=True):
         mock.chat.return_value = "Test response from agent"
         mock.reset_conversation.return_value = None
         mock.model = "gpt-4o-mini"
@@ -170,6 +178,102 @@ class TestStatsEndpoint:
         assert "timestamp" in data
 
 
+class TestTimestamp:
+    """Tests for response timestamps"""
+    
+    def test_iso_now_format(self):
+        """Test timestamps match the strftime ISO format"""
+        from src.api.main import _iso_now
+        
+        before = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        timestamp = _iso_now()
+        after = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        
+        assert timestamp in (before, after)
+
+
+class TestJSONResponse:
+    """Tests for the default JSON response class"""
+    
+    def test_renders_compact_json(self):
+        """Test responses render as compact JSON with the JSON media type"""
+        from src.api.main import FastJSONResponse
+        
+        response = FastJSONResponse(content={"status": "ok", "count": 2})
+        
+        assert json.loads(response.body) == {"status": "ok", "count": 2}
+        assert response.media_type == "application/json"
+
+
+class TestAgentConcurrency:
+    """Tests for access to the per-session agents"""
+    
+    @staticmethod
+    def _slow_agent(active, overlaps):
+        """Agent mock whose chat records how many calls overlap it"""
+        def slow_chat(message):
+            active.append(message)
+            overlaps.append(len(active))
+            time.sleep(0.02)
+            active.remove(message)
+            return message
+        
+        return Mock(chat=Mock(side_effect=slow_chat))
+    
+    def test_same_session_calls_serialized(self):
+        """Test concurrent calls for one session never overlap"""
+        from concurrent.futures import ThreadPoolExecutor
+        from src.api.main import _call_agent
+        
+        active = []
+        overlaps = []
+        session_agent = self._slow_agent(active, overlaps)
+        
+        with patch('src.api.main.LeaveAgent', return_value=session_agent), \
+                patch.dict('src.api.main._session_agents', clear=True):
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                results = list(pool.map(
+                    lambda m: _call_agent("session-1", "chat", m), range(8)
+                ))
+        
+        assert results == list(range(8))
+        assert max(overlaps) == 1
+    
+    def test_sessions_get_separate_agents(self):
+        """Test different sessions use their own agents and run in parallel"""
+        from concurrent.futures import ThreadPoolExecutor
+        from src.api.main import _call_agent, _get_session_agent
+        
+        active = []
+        overlaps = []
+        
+        with patch('src.api.main.LeaveAgent',
+                   side_effect=lambda: self._slow_agent(active, overlaps)), \
+                patch.dict('src.api.main._session_agents', clear=True):
+            assert _get_session_agent("a")[0] is _get_session_agent("a")[0]
+            assert _get_session_agent("a")[0] is not _get_session_agent("b")[0]
+            
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                list(pool.map(lambda s: _call_agent(s, "chat", s), ["a", "b"]))
+        
+        assert max(overlaps) == 2
+    
+    def test_session_agents_bounded(self):
+        """Test least recently used session agents are dropped"""
+        from src.api import main
+        
+        with patch('src.api.main.LeaveAgent', side_effect=Mock), \
+                patch.dict('src.api.main._session_agents', clear=True), \
+                patch('src.api.main.SESSION_AGENT_CACHE_SIZE', 2):
+            first = main._get_session_agent("a")[0]
+            main._get_session_agent("b")
+            main._get_session_agent("a")
+            main._get_session_agent("c")
+            
+            assert list(main._session_agents) == ["a", "c"]
+            assert main._get_session_agent("a")[0] is first
+
+
 class TestErrorHandling:
     """Tests for error handling"""
     
@@ -203,6 +307,17 @@ class TestMiddleware:
         assert "X-Process-Time" in response.headers
         # Should be a valid float
         float(response.headers["X-Process-Time"])
+    
+    def test_request_metrics_recorded(self, client):
+        """Test request count and duration metrics are recorded"""
+        client.get("/")
+        client.get("/nonexistent-endpoint")
+        
+        content = client.get("/metrics").text
+        
+        assert 'leave_agent_requests_total{endpoint="/",status="200"}' in content
+        assert 'endpoint="/nonexistent-endpoint",status="404"' in content
+        assert 'leave_agent_request_duration_seconds_count{endpoint="/"}' in content
 
 
 class TestCORS:
@@ -220,7 +335,3 @@ class TestCORS:
         
         # CORS middleware should add these headers
         assert "access-control-allow-origin" in response.headers
-
-
-if __name__ == "__main__":
-    pytest.main([__file__, "-v"])
\ No newline at end of file
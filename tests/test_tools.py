@@ -4,18 +4,15 @@ Comprehensive tests for leave policy and eligibility tools
 """
 
 import pytest
-from unittest.mock import Mock, patch, MagicMock
-from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+from datetime import date, datetime, timedelta
 
 from src.tools.leave_policy_tool import (
     LeavePolicyTool,
     leave_policy_tool,
     format_policy_for_display
 )
-from src.tools.eligibility_tool import (
-    EligibilityTool,
-    eligibility_tool
-)
+from src.tools.eligibility_tool import EligibilityTool, get_eligibility_tool
 from config.leave_policies import (
     LEAVE_POLICIES,
     MOCK_EMPLOYEES,
@@ -26,6 +23,50 @@ from config.leave_policies import (
 )
 
 
+def _assert_keys(container, *keys):
+    """Assert that a mapping or sequence contains every given key in one check"""
+    missing = set(keys).difference(container)
+    assert not missing, f"missing keys: {sorted(missing)}"
+
+
+# (country, leave type, expected policy values)
+POLICY_CASES = [
+    ("US", "PTO", {
+        "annual_allowance": 20,
+        "carryover_limit": 5,
+        "min_notice_days": 3,
+        "max_consecutive_days": 10
+    }),
+    ("US", "Sick Leave", {
+        "annual_allowance": 10,
+        "carryover_limit": 0,
+        "min_notice_days": 0
+    }),
+    ("US", "Parental Leave", {
+        "allowance_weeks": 16,
+        "eligibility_months": 12,
+        "paid": True
+    }),
+    ("India", "Privilege Leave", {
+        "annual_allowance": 18,
+        "carryover_limit": 30,
+        "min_notice_days": 7,
+        "encashment_allowed": True
+    }),
+    ("India", "Casual Leave", {
+        "annual_allowance": 12,
+        "max_consecutive_days": 3
+    }),
+]
+
+# (country, leave types its full policy must include)
+COUNTRY_CASES = [
+    ("US", ["PTO", "Sick Leave", "Parental Leave"]),
+    ("India", ["Privilege Leave", "Casual Leave", "Sick Leave", "Optional Holidays"]),
+    ("UK", ["Annual Leave", "Sick Leave"]),
+]
+
+
 class TestLeavePolicyTool:
     """Tests for Leave Policy Tool"""
     
@@ -39,123 +80,46 @@ class TestLeavePolicyTool:
         assert "US" in tool.supported_countries
         assert "India" in tool.supported_countries
     
-    def test_get_us_pto_policy(self):
-        """Test getting US PTO policy"""
-        result = leave_policy_tool(country="US", leave_type="PTO")
+    @pytest.mark.parametrize("country,leave_type,expected", POLICY_CASES)
+    def test_policy_lookup(self, country, leave_type, expected):
+        """Test getting a single leave policy and its key values"""
+        result = leave_policy_tool(country=country, leave_type=leave_type)
         
         assert result["success"] is True
-        assert result["country"] == "US"
-        assert result["leave_type"] == "PTO"
-        assert "PTO" in result["policies"]
+        assert result["country"] == country.upper()
+        assert result["leave_type"] == leave_type
+        assert leave_type in result["policies"]
         
-        pto_policy = result["policies"]["PTO"]
-        assert pto_policy["annual_allowance"] == 20
-        assert pto_policy["carryover_limit"] == 5
-        assert pto_policy["min_notice_days"] == 3
-        assert pto_policy["max_consecutive_days"] == 10
+        policy = result["policies"][leave_type]
+        for field, value in expected.items():
+            assert policy[field] == value
     
-    def test_get_us_sick_leave_policy(self):
-        """Test getting US Sick Leave policy"""
-        result = leave_policy_tool(country="US", leave_type="Sick Leave")
+    @pytest.mark.parametrize("country,leave_types", COUNTRY_CASES)
+    def test_country_policies(self, country, leave_types):
+        """Test getting all policies for a country without specifying type"""
+        result = leave_policy_tool(country=country)
         
         assert result["success"] is True
-        assert "Sick Leave" in result["policies"]
-        
-        sick_policy = result["policies"]["Sick Leave"]
-        assert sick_policy["annual_allowance"] == 10
-        assert sick_policy["carryover_limit"] == 0
-        assert sick_policy["min_notice_days"] == 0
+        assert result["country"] == country.upper()
+        assert list(result["available_leave_types"]) == list(result["policies"])
+        for leave_type in leave_types:
+            assert leave_type in result["policies"]
     
-    def test_get_us_parental_leave_policy(self):
-        """Test getting US Parental Leave policy"""
-        result = leave_policy_tool(country="US", leave_type="Parental Leave")
-        
-        assert result["success"] is True
-        assert "Parental Leave" in result["policies"]
-        
-        parental_policy = result["policies"]["Parental Leave"]
-        assert parental_policy["allowance_weeks"] == 16
-        assert parental_policy["eligibility_months"] == 12
-        assert parental_policy["paid"] is True
-    
-    def test_get_all_us_policies(self):
-        """Test getting all US policies without specifying type"""
-        result = leave_policy_tool(country="US")
+    @pytest.mark.parametrize("country", ["us", "US", "Us", "  US  "])
+    def test_case_insensitive_country(self, country):
+        """Test that country lookup ignores case and surrounding whitespace"""
+        result = leave_policy_tool(country=country)
         
         assert result["success"] is True
         assert result["country"] == "US"
-        assert "available_leave_types" in result
-        assert len(result["policies"]) >= 3
-        assert "PTO" in result["policies"]
-        assert "Sick Leave" in result["policies"]
-        assert "Parental Leave" in result["policies"]
     
-    def test_get_india_privilege_leave(self):
-        """Test getting India Privilege Leave policy"""
-        result = leave_policy_tool(country="India", leave_type="Privilege Leave")
+    @pytest.mark.parametrize("leave_type", ["pto", "PTO", "Pto", "  PTO  "])
+    def test_case_insensitive_leave_type(self, leave_type):
+        """Test that leave type lookup ignores case and surrounding whitespace"""
+        result = leave_policy_tool(country="  US  ", leave_type=leave_type)
         
         assert result["success"] is True
-        assert result["country"] == "INDIA"
-        assert "Privilege Leave" in result["policies"]
-        
-        pl_policy = result["policies"]["Privilege Leave"]
-        assert pl_policy["annual_allowance"] == 18
-        assert pl_policy["carryover_limit"] == 30
-        assert pl_policy["min_notice_days"] == 7
-        assert pl_policy["encashment_allowed"] is True
-    
-    def test_get_india_casual_leave(self):
-        """Test getting India Casual Leave policy"""
-        result = leave_policy_tool(country="India", leave_type="Casual Leave")
-        
-        assert result["success"] is True
-        assert "Casual Leave" in result["policies"]
-        
-        cl_policy = result["policies"]["Casual Leave"]
-        assert cl_policy["annual_allowance"] == 12
-        assert cl_policy["max_consecutive_days"] == 3
-    
-    def test_get_all_india_policies(self):
-        """Test getting all India policies"""
-        result = leave_policy_tool(country="India")
-        
-        assert result["success"] is True
-        assert "Privilege Leave" in result["policies"]
-        assert "Casual Leave" in result["policies"]
-        assert "Sick Leave" in result["policies"]
-        assert "Optional Holidays" in result["policies"]
-    
-    def test_get_uk_policies(self):
-        """Test getting UK policies"""
-        result = leave_policy_tool(country="UK")
-        
-        assert result["success"] is True
-        assert result["country"] == "UK"
-        assert "Annual Leave" in result["policies"]
-        assert "Sick Leave" in result["policies"]
-    
-    def test_case_insensitive_country(self):
-        """Test that country lookup is case-insensitive"""
-        result1 = leave_policy_tool(country="us")
-        result2 = leave_policy_tool(country="US")
-        result3 = leave_policy_tool(country="Us")
-        
-        assert result1["success"] is True
-        assert result2["success"] is True
-        assert result3["success"] is True
-        assert result1["country"] == "US"
-        assert result2["country"] == "US"
-        assert result3["country"] == "US"
-    
-    def test_case_insensitive_leave_type(self):
-        """Test that leave type lookup is case-insensitive"""
-        result1 = leave_policy_tool(country="US", leave_type="pto")
-        result2 = leave_policy_tool(country="US", leave_type="PTO")
-        result3 = leave_policy_tool(country="US", leave_type="Pto")
-        
-        assert result1["success"] is True
-        assert result2["success"] is True
-        assert result3["success"] is True
+        assert "PTO" in result["policies"]
     
     def test_invalid_country(self):
         """Test handling of invalid country"""
@@ -175,12 +139,58 @@ class TestLeavePolicyTool:
         assert "available_leave_types" in result
         assert result["country"] == "US"
     
-    def test_whitespace_handling(self):
-        """Test handling of whitespace in inputs"""
-        result = leave_policy_tool(country="  US  ", leave_type="  PTO  ")
+    def test_leave_type_prefix_match(self):
+        """Test unique prefixes and trailing words resolve to a leave type"""
+        result = leave_policy_tool(country="US", leave_type="sick")
         
         assert result["success"] is True
-        assert result["country"] == "US"
+        assert result["leave_type"] == "Sick Leave"
+        assert result["matched_via"] == "prefix"
+        assert "Sick Leave" in result["policies"]
+        
+        assert leave_policy_tool(country="US", leave_type="PTO days")["leave_type"] == "PTO"
+        
+        # Ambiguous prefixes are still rejected
+        result = leave_policy_tool(country="US", leave_type="p")
+        assert result["success"] is False
+        assert "not found" in result["error"]
+        
+        # Unique prefixes shorter than three characters are rejected too
+        for short in ("s", "si"):
+            result = leave_policy_tool(country="US", leave_type=short)
+            assert result["success"] is False
+            assert "not found" in result["error"]
+        assert leave_policy_tool(country="US", leave_type="sic")["leave_type"] == "Sick Leave"
+    
+    def test_lookup_memoized(self):
+        """Test equivalent lookups are served from one cached response"""
+        tool = LeavePolicyTool()
+        
+        result = tool(country="US", leave_type="PTO")
+        
+        assert tool(country=" us ", leave_type="PTO ") is result
+        assert tool(country="US", leave_type="Sick Leave") is not result
+        
+        # Canonical spellings are answered from responses built at init
+        assert result is tool._responses[("US", "PTO")]
+        assert tool(country="us", leave_type="pto")["leave_type"] == "pto"
+        assert tool(country="us", leave_type="pto") is tool._lookup_cache[("US", "pto")]
+        assert tool(country="India") is tool(country="INDIA")
+    
+    def test_lookup_cache_per_instance(self):
+        """Test memoized lookups are not shared and don't keep tools alive"""
+        import gc
+        import weakref
+        
+        tool = LeavePolicyTool()
+        result = tool(country="US", leave_type="sick")
+        
+        assert LeavePolicyTool()(country="US", leave_type="sick") is not result
+        
+        ref = weakref.ref(tool)
+        del tool
+        gc.collect()
+        assert ref() is None
     
     def test_tool_schema(self):
         """Test that tool schema is properly defined"""
@@ -188,13 +198,11 @@ class TestLeavePolicyTool:
         schema = tool.get_schema()
         
         assert schema["name"] == "get_leave_policy"
-        assert "description" in schema
-        assert "parameters" in schema
-        assert "properties" in schema["parameters"]
-        assert "country" in schema["parameters"]["properties"]
-        assert "leave_type" in schema["parameters"]["properties"]
-        assert "required" in schema["parameters"]
-        assert "country" in schema["parameters"]["required"]
+        assert schema.keys() >= {"description", "parameters"}
+        assert schema["parameters"].keys() >= {"properties", "required"}
+        _assert_keys(schema["parameters"]["properties"], "country", "leave_type")
+        _assert_keys(schema["parameters"]["required"], "country")
+        assert tool.get_schema() is schema
     
     def test_format_policy_for_display(self):
         """Test policy formatting for display"""
@@ -228,32 +236,73 @@ class TestLeavePolicyTool:
         assert "Country not found" in formatted
 
 
+def _index_checks(result):
+    """Map each eligibility check in a result to its check_name"""
+    return {c["check_name"]: c for c in result["checks"]}
+
+
+# Start dates relative to today, formatted once per run
+_NOW = datetime.now()
+TOMORROW = (_NOW + timedelta(days=1)).strftime("%Y-%m-%d")
+FUTURE_3 = (_NOW + timedelta(days=3)).strftime("%Y-%m-%d")
+FUTURE_10 = (_NOW + timedelta(days=10)).strftime("%Y-%m-%d")
+
+# Shared read-only mock employee records
+_EMP001 = MOCK_EMPLOYEES["EMP001"]
+_EMP002 = MOCK_EMPLOYEES["EMP002"]
+
+
+# (leave type, days requested, start date, expected eligibility or None, check, check passed)
+ELIGIBILITY_CASES = [
+    ("PTO", 5, None, True, "Leave Balance", True),
+    ("Parental Leave", None, None, None, "Tenure Requirement", True),  # EMP001 has 14 months
+    ("PTO", None, FUTURE_10, None, "Notice Period", True),
+    ("PTO", None, TOMORROW, False, "Notice Period", False),  # PTO needs 3 days notice
+    ("PTO", 7, None, None, "Consecutive Days Limit", True),  # Within 10-day limit
+    ("PTO", 15, None, False, "Consecutive Days Limit", False),
+    ("PTO", None, "2025-12-25", None, "Blackout Period", False),  # Dec 20-31 blackout
+]
+ELIGIBILITY_CASE_IDS = [
+    "balance-ok", "tenure-met", "notice-sufficient", "notice-insufficient",
+    "consecutive-within", "consecutive-exceeds", "blackout",
+]
+
+
+@pytest.fixture
+def junior_us_employee():
+    """Fresh mutable copy of EMP003 moved to the US with 2 months tenure"""
+    employee = MOCK_EMPLOYEES["EMP003"].copy()
+    employee["tenure_months"] = 2  # Less than required for Parental Leave
+    employee["country"] = "US"  # Change to US for Parental Leave
+    return employee
+
+
+@pytest.fixture(scope="class")
+def snowflake_factory():
+    """Patch get_snowflake_client once per class; tools built there get a mock"""
+    factory = MagicMock()
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr('src.tools.eligibility_tool.get_snowflake_client', factory)
+        yield factory
+
+
+@pytest.mark.usefixtures("snowflake_factory")
 class TestEligibilityTool:
     """Tests for Eligibility Tool"""
     
-    @patch('src.tools.eligibility_tool.get_snowflake_client')
-    def test_tool_initialization(self, mock_snowflake):
+    def test_tool_initialization(self):
         """Test tool is properly initialized"""
-        mock_client = Mock()
-        mock_snowflake.return_value = mock_client
-        
         tool = EligibilityTool()
         
         assert tool.name == "check_leave_eligibility"
         assert tool.description is not None
         assert tool.snowflake_client is not None
     
-    @patch('src.tools.eligibility_tool.get_snowflake_client')
-    def test_eligible_employee_basic(self, mock_snowflake):
+    def test_eligible_employee_basic(self, eligibility_tool_instance, mock_snowflake_client):
         """Test basic eligibility check for eligible employee"""
-        mock_client = Mock()
-        mock_client.get_employee_by_id.return_value = MOCK_EMPLOYEES["EMP001"]
-        mock_snowflake.return_value = mock_client
-        
-        tool = EligibilityTool()
-        tool.snowflake_client = mock_client
+        mock_snowflake_client.get_employee_by_id.return_value = _EMP001
         
-        result = tool(
+        result = eligibility_tool_instance(
             employee_id="EMP001",
             leave_type="PTO"
         )
@@ -265,41 +314,11 @@ class TestEligibilityTool:
         assert result["country"] == "US"
         assert result["leave_type"] == "PTO"
     
-    @patch('src.tools.eligibility_tool.get_snowflake_client')
-    def test_eligible_with_days_requested(self, mock_snowflake):
-        """Test eligibility with specific days requested"""
-        mock_client = Mock()
-        mock_client.get_employee_by_id.return_value = MOCK_EMPLOYEES["EMP001"]
-        mock_snowflake.return_value = mock_client
-        
-        tool = EligibilityTool()
-        tool.snowflake_client = mock_client
-        
-        result = tool(
-            employee_id="EMP001",
-            leave_type="PTO",
-            days_requested=5
-        )
-        
-        assert result["success"] is True
-        assert result["eligible"] is True
-        
-        # Check that balance check was performed
-        balance_checks = [c for c in result["checks"] if "Balance" in c["check_name"]]
-        assert len(balance_checks) > 0
-        assert balance_checks[0]["passed"] is True
-    
-    @patch('src.tools.eligibility_tool.get_snowflake_client')
-    def test_insufficient_balance(self, mock_snowflake):
+    def test_insufficient_balance(self, eligibility_tool_instance, mock_snowflake_client):
         """Test employee with insufficient leave balance"""
-        mock_client = Mock()
-        mock_client.get_employee_by_id.return_value = MOCK_EMPLOYEES["EMP001"]
-        mock_snowflake.return_value = mock_client
+        mock_snowflake_client.get_employee_by_id.return_value = _EMP001
         
-        tool = EligibilityTool()
-        tool.snowflake_client = mock_client
-        
-        result = tool(
+        result = eligibility_tool_instance(
             employee_id="EMP001",
             leave_type="PTO",
             days_requested=50  # More than available (15)
@@ -310,17 +329,37 @@ class TestEligibilityTool:
         assert "reasons" in result
         assert any("Insufficient" in r for r in result["reasons"])
     
-    @patch('src.tools.eligibility_tool.get_snowflake_client')
-    def test_employee_not_found(self, mock_snowflake):
-        """Test handling when employee is not found"""
-        mock_client = Mock()
-        mock_client.get_employee_by_id.return_value = None
-        mock_snowflake.return_value = mock_client
+    @pytest.mark.parametrize(
+        "leave_type,days_requested,start_date,expected_eligible,check_name,check_passed",
+        ELIGIBILITY_CASES,
+        ids=ELIGIBILITY_CASE_IDS
+    )
+    def test_eligibility_matrix(
+        self, eligibility_tool_instance, mock_snowflake_client, leave_type,
+        days_requested, start_date, expected_eligible, check_name, check_passed
+    ):
+        """Test the outcome of each eligibility check for EMP001"""
+        mock_snowflake_client.get_employee_by_id.return_value = _EMP001
+        
+        result = eligibility_tool_instance(
+            employee_id="EMP001",
+            leave_type=leave_type,
+            days_requested=days_requested,
+            start_date=start_date
+        )
         
-        tool = EligibilityTool()
-        tool.snowflake_client = mock_client
+        assert result["success"] is True
+        if expected_eligible is not None:
+            assert result["eligible"] is expected_eligible
+        
+        check = _index_checks(result)[check_name]
+        assert check["passed"] is check_passed
+    
+    def test_employee_not_found(self, eligibility_tool_instance, mock_snowflake_client):
+        """Test handling when employee is not found"""
+        mock_snowflake_client.get_employee_by_id.return_value = None
         
-        result = tool(
+        result = eligibility_tool_instance(
             employee_id="INVALID123",
             leave_type="PTO"
         )
@@ -329,17 +368,11 @@ class TestEligibilityTool:
         assert result["eligible"] is False
         assert "not found" in result["error"].lower()
     
-    @patch('src.tools.eligibility_tool.get_snowflake_client')
-    def test_invalid_leave_type(self, mock_snowflake):
+    def test_invalid_leave_type(self, eligibility_tool_instance, mock_snowflake_client):
         """Test handling when leave type is not found"""
-        mock_client = Mock()
-        mock_client.get_employee_by_id.return_value = MOCK_EMPLOYEES["EMP001"]
-        mock_snowflake.return_value = mock_client
+        mock_snowflake_client.get_employee_by_id.return_value = _EMP001
         
-        tool = EligibilityTool()
-        tool.snowflake_client = mock_client
-        
-        result = tool(
+        result = eligibility_tool_instance(
             employee_id="EMP001",
             leave_type="InvalidLeave"
         )
@@ -348,45 +381,13 @@ class TestEligibilityTool:
         assert result["eligible"] is False
         assert "not found" in result["error"].lower()
     
-    @patch('src.tools.eligibility_tool.get_snowflake_client')
-    def test_tenure_requirement_met(self, mock_snowflake):
-        """Test eligibility with tenure requirement met"""
-        mock_client = Mock()
-        mock_client.get_employee_by_id.return_value = MOCK_EMPLOYEES["EMP001"]
-        mock_snowflake.return_value = mock_client
-        
-        tool = EligibilityTool()
-        tool.snowflake_client = mock_client
-        
-        result = tool(
-            employee_id="EMP001",
-            leave_type="Parental Leave"  # Requires 12 months tenure
-        )
-        
-        assert result["success"] is True
-        
-        # EMP001 has 14 months tenure, should pass
-        tenure_checks = [c for c in result["checks"] if "Tenure" in c["check_name"]]
-        if tenure_checks:
-            assert tenure_checks[0]["passed"] is True
-    
-    @patch('src.tools.eligibility_tool.get_snowflake_client')
-    def test_tenure_requirement_not_met(self, mock_snowflake):
+    def test_tenure_requirement_not_met(
+        self, eligibility_tool_instance, mock_snowflake_client, junior_us_employee
+    ):
         """Test eligibility with insufficient tenure"""
-        mock_client = Mock()
+        mock_snowflake_client.get_employee_by_id.return_value = junior_us_employee
         
-        # Create employee with insufficient tenure
-        employee = MOCK_EMPLOYEES["EMP003"].copy()
-        employee["tenure_months"] = 2  # Less than required
-        employee["country"] = "US"  # Change to US for Parental Leave
-        
-        mock_client.get_employee_by_id.return_value = employee
-        mock_snowflake.return_value = mock_client
-        
-        tool = EligibilityTool()
-        tool.snowflake_client = mock_client
-        
-        result = tool(
+        result = eligibility_tool_instance(
             employee_id="EMP003",
             leave_type="Parental Leave"  # Requires 12 months
         )
@@ -394,140 +395,52 @@ class TestEligibilityTool:
         assert result["success"] is True
         assert result["eligible"] is False
         
-        tenure_checks = [c for c in result["checks"] if "Tenure" in c["check_name"]]
-        if tenure_checks:
-            assert tenure_checks[0]["passed"] is False
+        tenure_check = _index_checks(result).get("Tenure Requirement")
+        if tenure_check:
+            assert tenure_check["passed"] is False
     
-    @patch('src.tools.eligibility_tool.get_snowflake_client')
-    def test_notice_period_sufficient(self, mock_snowflake):
-        """Test eligibility with sufficient notice period"""
-        mock_client = Mock()
-        mock_client.get_employee_by_id.return_value = MOCK_EMPLOYEES["EMP001"]
-        mock_snowflake.return_value = mock_client
+    def test_notice_period_counts_calendar_days(
+        self, eligibility_tool_instance, mock_snowflake_client
+    ):
+        """Test notice is counted in whole days from today"""
+        mock_snowflake_client.get_employee_by_id.return_value = _EMP001
         
-        tool = EligibilityTool()
-        tool.snowflake_client = mock_client
-        
-        # Request leave 10 days from now (more than 3 days required)
-        future_date = (datetime.now() + timedelta(days=10)).strftime("%Y-%m-%d")
-        
-        result = tool(
+        # Exactly the 3 days of notice required for PTO
+        result = eligibility_tool_instance(
             employee_id="EMP001",
             leave_type="PTO",
-            start_date=future_date
+            start_date=FUTURE_3
         )
         
-        assert result["success"] is True
-        
-        notice_checks = [c for c in result["checks"] if "Notice" in c["check_name"]]
-        if notice_checks:
-            assert notice_checks[0]["passed"] is True
+        notice_check = _index_checks(result)["Notice Period"]
+        assert notice_check["details"]["days_notice_given"] == 3
+        assert notice_check["passed"] is True
     
-    @patch('src.tools.eligibility_tool.get_snowflake_client')
-    def test_notice_period_insufficient(self, mock_snowflake):
-        """Test eligibility with insufficient notice period"""
-        mock_client = Mock()
-        mock_client.get_employee_by_id.return_value = MOCK_EMPLOYEES["EMP001"]
-        mock_snowflake.return_value = mock_client
-        
-        tool = EligibilityTool()
-        tool.snowflake_client = mock_client
-        
-        # Request leave tomorrow (less than 3 days required for PTO)
-        tomorrow = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
-        
-        result = tool(
-            employee_id="EMP001",
-            leave_type="PTO",
-            start_date=tomorrow
-        )
+    def test_blackout_month_parsing(self):
+        """Test blackout periods resolve to their month"""
+        from src.tools.eligibility_tool import _blackout_month
         
-        assert result["success"] is True
-        assert result["eligible"] is False
-        
-        notice_checks = [c for c in result["checks"] if "Notice" in c["check_name"]]
-        if notice_checks:
-            assert notice_checks[0]["passed"] is False
+        assert _blackout_month("Dec 20-31") == 12
+        assert _blackout_month("1-15 january") == 1
+        assert _blackout_month("Year end") is None
     
-    @patch('src.tools.eligibility_tool.get_snowflake_client')
-    def test_consecutive_days_within_limit(self, mock_snowflake):
-        """Test eligibility with days within consecutive limit"""
-        mock_client = Mock()
-        mock_client.get_employee_by_id.return_value = MOCK_EMPLOYEES["EMP001"]
-        mock_snowflake.return_value = mock_client
-        
-        tool = EligibilityTool()
-        tool.snowflake_client = mock_client
+    def test_start_date_parsing(self):
+        """Test only YYYY-MM-DD dates parse, with strptime's error messages"""
+        from src.tools.eligibility_tool import _parse_start_date
         
-        result = tool(
-            employee_id="EMP001",
-            leave_type="PTO",
-            days_requested=7  # Within 10-day limit
+        assert _parse_start_date("2025-01-05") == date(2025, 1, 5)
+        assert _parse_start_date("2025-1-5") == date(2025, 1, 5)
+        assert isinstance(_parse_start_date("2025-W01-1"), ValueError)
+        assert isinstance(_parse_start_date("20250105"), ValueError)
+        assert str(_parse_start_date("2025-13-01")) == (
+            "time data '2025-13-01' does not match format '%Y-%m-%d'"
         )
-        
-        assert result["success"] is True
-        
-        consecutive_checks = [c for c in result["checks"] if "Consecutive" in c["check_name"]]
-        if consecutive_checks:
-            assert consecutive_checks[0]["passed"] is True
-    
-    @patch('src.tools.eligibility_tool.get_snowflake_client')
-    def test_consecutive_days_exceeds_limit(self, mock_snowflake):
-        """Test eligibility with days exceeding consecutive limit"""
-        mock_client = Mock()
-        mock_client.get_employee_by_id.return_value = MOCK_EMPLOYEES["EMP001"]
-        mock_snowflake.return_value = mock_client
-        
-        tool = EligibilityTool()
-        tool.snowflake_client = mock_client
-        
-        result = tool(
-            employee_id="EMP001",
-            leave_type="PTO",
-            days_requested=15  # Exceeds 10-day limit
-        )
-        
-        assert result["success"] is True
-        assert result["eligible"] is False
-        
-        consecutive_checks = [c for c in result["checks"] if "Consecutive" in c["check_name"]]
-        if consecutive_checks:
-            assert consecutive_checks[0]["passed"] is False
-    
-    @patch('src.tools.eligibility_tool.get_snowflake_client')
-    def test_blackout_period_check(self, mock_snowflake):
-        """Test eligibility during blackout period"""
-        mock_client = Mock()
-        mock_client.get_employee_by_id.return_value = MOCK_EMPLOYEES["EMP001"]
-        mock_snowflake.return_value = mock_client
-        
-        tool = EligibilityTool()
-        tool.snowflake_client = mock_client
-        
-        # December 25 falls in blackout period (Dec 20-31)
-        result = tool(
-            employee_id="EMP001",
-            leave_type="PTO",
-            start_date="2025-12-25"
-        )
-        
-        assert result["success"] is True
-        
-        blackout_checks = [c for c in result["checks"] if "Blackout" in c["check_name"]]
-        if blackout_checks:
-            assert blackout_checks[0]["passed"] is False
     
-    @patch('src.tools.eligibility_tool.get_snowflake_client')
-    def test_invalid_date_format(self, mock_snowflake):
+    def test_invalid_date_format(self, eligibility_tool_instance, mock_snowflake_client):
         """Test handling of invalid date format"""
-        mock_client = Mock()
-        mock_client.get_employee_by_id.return_value = MOCK_EMPLOYEES["EMP001"]
-        mock_snowflake.return_value = mock_client
+        mock_snowflake_client.get_employee_by_id.return_value = _EMP001
         
-        tool = EligibilityTool()
-        tool.snowflake_client = mock_client
-        
-        result = tool(
+        result = eligibility_tool_instance(
             employee_id="EMP001",
             leave_type="PTO",
             start_date="invalid-date"
@@ -535,40 +448,53 @@ class TestEligibilityTool:
         
         assert result["success"] is True
         # Should have a failed check for invalid date
-        notice_checks = [c for c in result["checks"] if "Notice" in c["check_name"]]
-        if notice_checks:
-            assert notice_checks[0]["passed"] is False
+        notice_check = _index_checks(result).get("Notice Period")
+        if notice_check:
+            assert notice_check["passed"] is False
     
-    @patch('src.tools.eligibility_tool.get_snowflake_client')
-    def test_tool_schema(self, mock_snowflake):
+    def test_tool_schema(self):
         """Test that tool schema is properly defined"""
-        mock_client = Mock()
-        mock_snowflake.return_value = mock_client
-        
         tool = EligibilityTool()
         schema = tool.get_schema()
         
         assert schema["name"] == "check_leave_eligibility"
-        assert "description" in schema
-        assert "parameters" in schema
-        assert "employee_id" in schema["parameters"]["properties"]
-        assert "leave_type" in schema["parameters"]["properties"]
-        assert "start_date" in schema["parameters"]["properties"]
-        assert "days_requested" in schema["parameters"]["properties"]
-        assert "employee_id" in schema["parameters"]["required"]
-        assert "leave_type" in schema["parameters"]["required"]
-    
-    @patch('src.tools.eligibility_tool.get_snowflake_client')
-    def test_india_employee_eligibility(self, mock_snowflake):
+        assert schema.keys() >= {"description", "parameters"}
+        _assert_keys(
+            schema["parameters"]["properties"],
+            "employee_id", "leave_type", "start_date", "days_requested"
+        )
+        _assert_keys(schema["parameters"]["required"], "employee_id", "leave_type")
+        assert tool.get_schema() is schema
+    
+    def test_singleton_created_lazily(self, snowflake_factory):
+        """Test the shared tool is only built on first use"""
+        import src.tools
+        import src.tools.eligibility_tool as eligibility_module
+        
+        get_eligibility_tool.cache_clear()
+        snowflake_factory.reset_mock()
+        try:
+            snowflake_factory.assert_not_called()
+            
+            tool = get_eligibility_tool()
+            
+            assert isinstance(tool, EligibilityTool)
+            assert tool.snowflake_client is snowflake_factory.return_value
+            assert get_eligibility_tool() is tool
+            snowflake_factory.assert_called_once()
+            
+            # The submodule stays bound on the package, and the package
+            # re-exports the same accessor
+            assert src.tools.eligibility_tool is eligibility_module
+            assert src.tools.get_eligibility_tool() is tool
+        finally:
+            get_eligibility_tool.cache_clear()
+    
+    def test_india_employee_eligibility(self, eligibility_tool_instance, mock_snowflake_client):
         """Test eligibility for India employee"""
-        mock_client = Mock()
-        mock_client.get_employee_by_id.return_value = MOCK_EMPLOYEES["EMP002"]
-        mock_snowflake.return_value = mock_client
+        mock_snowflake_client.get_employee_by_id.return_value = _EMP002
         
-        tool = EligibilityTool()
-        tool.snowflake_client = mock_client
-        
-        result = tool(
+        result = eligibility_tool_instance(
             employee_id="EMP002",
             leave_type="Privilege Leave",
             days_requested=10
@@ -578,28 +504,19 @@ class TestEligibilityTool:
         assert result["country"] == "India"
         assert result["leave_type"] == "Privilege Leave"
     
-    @patch('src.tools.eligibility_tool.get_snowflake_client')
-    def test_complete_eligibility_check(self, mock_snowflake):
+    def test_complete_eligibility_check(self, eligibility_tool_instance, mock_snowflake_client):
         """Test complete eligibility check with all parameters"""
-        mock_client = Mock()
-        mock_client.get_employee_by_id.return_value = MOCK_EMPLOYEES["EMP001"]
-        mock_snowflake.return_value = mock_client
-        
-        tool = EligibilityTool()
-        tool.snowflake_client = mock_client
-        
-        future_date = (datetime.now() + timedelta(days=10)).strftime("%Y-%m-%d")
+        mock_snowflake_client.get_employee_by_id.return_value = _EMP001
         
-        result = tool(
+        result = eligibility_tool_instance(
             employee_id="EMP001",
             leave_type="PTO",
-            start_date=future_date,
+            start_date=FUTURE_10,
             days_requested=5
         )
         
         assert result["success"] is True
-        assert "checks" in result
-        assert "summary" in result
+        assert result.keys() >= {"checks", "summary"}
         assert result["summary"]["total_checks"] > 0
 
 
@@ -613,6 +530,28 @@ class TestConfigFunctions:
         assert policy is not None
         assert "PTO" in policy
         assert policy["PTO"]["annual_allowance"] == 20
+        assert policy["PTO"] == LEAVE_POLICIES["US"]["PTO"]
+        assert get_leave_policy("UK", "annual leave")["Annual Leave"] == (
+            LEAVE_POLICIES["UK"]["Annual Leave"]
+        )
+    
+    def test_get_leave_policy_case_insensitive_country(self):
+        """Test get_leave_policy matches countries regardless of case"""
+        for country in ("India", "INDIA", "india"):
+            policy = get_leave_policy(country, "privilege leave")
+            
+            assert policy is not None
+            assert "Privilege Leave" in policy
+        
+        assert "Casual Leave" in get_leave_policy("INDIA")
+        assert "Casual Leave" in list_leave_types("INDIA")
+    
+    def test_get_leave_policy_shared_result(self):
+        """Test case variants of a lookup share one prebuilt result"""
+        policy = get_leave_policy("US", "PTO")
+        
+        assert get_leave_policy("us", "pto") is policy
+        assert get_leave_policy("US", "Unknown") is None
     
     def test_get_employee_data_function(self):
         """Test get_employee_data helper function"""
@@ -628,25 +567,17 @@ class TestConfigFunctions:
         countries = list_countries()
         
         assert len(countries) > 0
-        assert "US" in countries
-        assert "India" in countries
-        assert "UK" in countries
+        _assert_keys(countries, "US", "India", "UK")
     
     def test_list_leave_types_function(self):
         """Test list_leave_types helper function"""
         us_types = list_leave_types("US")
         
         assert len(us_types) > 0
-        assert "PTO" in us_types
-        assert "Sick Leave" in us_types
-        assert "Parental Leave" in us_types
+        _assert_keys(us_types, "PTO", "Sick Leave", "Parental Leave")
     
     def test_list_leave_types_invalid_country(self):
         """Test list_leave_types with invalid country"""
         types = list_leave_types("InvalidCountry")
         
-        assert types == []
-
-
-if __name__ == "__main__":
-    pytest.main([__file__, "-v", "--cov=src.tools", "--cov-report=term"])
\ No newline at end of file
+        assert types == ()